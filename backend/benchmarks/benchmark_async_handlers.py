@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Wall-clock benchmark of the sync and asyncio paths on a bulk invitation batch
+
+For each path, POSTs one --invitations-row batch to /api/send-invitations
+and then drains the email outbox until that batch's emails are sent, the
+same two steps a bulk invite takes in production. Email goes to the
+in-process fake transport with --latency seconds per API call (plus
+--per-recipient-latency per recipient), so the sync path pays every call in
+turn while the async path has up to ASYNC_MAX_CONCURRENCY in flight.
+EMAIL_BATCH_SIZE (50 here unless set) decides how many API calls a batch
+takes.
+
+Needs asyncpg and a scratch database in DB_HOST/DB_NAME/DB_USER/
+DB_PASSWORD/DB_PORT with database/schema.sql loaded; the drain sends any
+other pending outbox rows too. Generated rows are removed at the end.
+
+    python benchmark_async_handlers.py --invitations 500 --repeats 3
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import argparse
+import statistics
+
+os.environ.setdefault('EMAIL_TRANSPORT', 'fake')
+os.environ.setdefault('EMAIL_BATCH_SIZE', '50')
+os.environ.setdefault('DASHBOARD_STATS_TTL', '0')
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda-functions'))
+
+import lambda_function_final as api
+import async_handlers
+from email_transport import AsyncFakeTransport, FakeTransport, set_async_email_transport, set_email_transport
+
+ROLES = ('entrepreneur', 'investor', 'affiliate')
+
+def bulk_event(count, domain, run):
+    invitations = [{
+        'firstName': 'Bench',
+        'lastName': f'Async{i}',
+        'email': f'bulk-{run}-{i}@{domain}',
+        'role': ROLES[i % len(ROLES)]
+    } for i in range(count)]
+    return {
+        'httpMethod': 'POST',
+        'path': '/api/send-invitations',
+        'headers': {'Content-Type': 'application/json'},
+        'queryStringParameters': None,
+        'pathParameters': None,
+        'body': json.dumps(invitations),
+        'isBase64Encoded': False,
+        'requestContext': {'stage': 'bench', 'requestId': uuid.uuid4().hex}
+    }
+
+def run_batch(handler, count, domain, run):
+    """Seconds to insert one batch and send its emails: (total, insert, drain)"""
+    start = time.perf_counter()
+    response = handler(bulk_event(count, domain, run), None)
+    inserted = time.perf_counter()
+    sent = json.loads(response['body']).get('sent')
+    if response['statusCode'] != 200 or sent != count:
+        raise SystemExit(f"Bulk insert failed: {response['statusCode']} {response['body'][:300]}")
+
+    summary = handler({'action': 'drain-email-outbox'}, None)
+    done = time.perf_counter()
+    if summary['sent'] < count:
+        raise SystemExit(f"Drain sent {summary['sent']} of {count}: {summary}")
+    return done - start, inserted - start, done - inserted
+
+def cleanup(domain):
+    conn = api.get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM email_logs WHERE recipient_email LIKE %s", (f"%@{domain}",))
+    cursor.execute("DELETE FROM invitations WHERE email LIKE %s", (f"%@{domain}",))
+    conn.commit()
+    cursor.close()
+    api.release_db_connection(conn)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--invitations', type=int, default=500, help='rows per bulk request')
+    parser.add_argument('--repeats', type=int, default=3, help='batches per path')
+    parser.add_argument('--latency', type=float, default=0.2, help='simulated seconds per email API call')
+    parser.add_argument('--per-recipient-latency', type=float, default=0.001,
+                        help='simulated seconds per recipient in a call')
+    args = parser.parse_args()
+
+    if async_handlers.asyncpg is None:
+        raise SystemExit("asyncpg is not installed - pip install asyncpg")
+
+    api.logger.setLevel(os.environ.get('LOG_LEVEL', 'WARNING'))
+    set_email_transport(FakeTransport(args.latency, per_recipient_latency=args.per_recipient_latency))
+    set_async_email_transport(AsyncFakeTransport(args.latency, per_recipient_latency=args.per_recipient_latency))
+
+    domain = f"async-bench-{uuid.uuid4().hex[:8]}.example.com"
+    paths = [('sync', api.lambda_handler), ('async', async_handlers.lambda_handler)]
+
+    print(f"{args.invitations} invitations per batch, EMAIL_BATCH_SIZE={os.environ['EMAIL_BATCH_SIZE']}, "
+          f"ASYNC_MAX_CONCURRENCY={async_handlers.ASYNC_MAX_CONCURRENCY}, {args.latency * 1000:g} ms per call")
+    print(f"{'Path':<7} {'total s':>8} {'insert s':>9} {'drain s':>8}")
+    print("=" * 35)
+    medians = {}
+    try:
+        # Warm both paths (connections, templates, event loop) before timing
+        for label, handler in paths:
+            run_batch(handler, 3, domain, f'warm-{label}')
+
+        for label, handler in paths:
+            timings = [run_batch(handler, args.invitations, domain, f'{label}-{i}') for i in range(args.repeats)]
+            total, insert, drain = (statistics.median(column) for column in zip(*timings))
+            medians[label] = total
+            print(f"{label:<7} {total:>8.2f} {insert:>9.2f} {drain:>8.2f}")
+    finally:
+        cleanup(domain)
+        async_handlers.run(async_handlers.close_db_pool())
+
+    saved = medians['sync'] - medians['async']
+    print(f"\nasync saves {saved:.2f}s per batch ({saved / medians['sync']:.0%}), "
+          f"{medians['sync'] / medians['async']:.1f}x faster")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark invitation email rendering for bulk sends
+
+Compares building the body from source for every recipient (what the
+inline f-string in the old send_invitation_email amounted to) with the
+compiled, role-cached template: a full escaped render, and the
+per-recipient substitutions used for batched sends.
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda-functions'))
+
+from email_templates import INVITATION_ACCEPT_URL, TEMPLATES, CompiledTemplate, get_email_template
+
+def parse_per_recipient(values):
+    """The pre-template cost model: build the whole body from source for every recipient"""
+    template = CompiledTemplate(TEMPLATES['invitation']['html'], {
+        'role': values['role'],
+        'roleTitle': values['role'].title(),
+        'acceptUrl': INVITATION_ACCEPT_URL
+    })
+    return template.render(values)
+
+def measure(label, count, render):
+    start = time.perf_counter()
+    for i in range(count):
+        render(i)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<30} {count / elapsed:>12,.0f} renders/s {elapsed / count * 1e6:>8.2f} us")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--renders', type=int, default=100000)
+    args = parser.parse_args()
+
+    roles = ('entrepreneur', 'investor', 'affiliate')
+    values = [
+        {'firstName': f"O'Brien <{i}>", 'invitationCode': f'INV{i:06X}1A2B3C4D',
+         'email': f'user+{i}@example.com', 'role': roles[i % 3]}
+        for i in range(1000)
+    ]
+
+    measure('parse + render per recipient', args.renders,
+            lambda i: parse_per_recipient(values[i % 1000]))
+    measure('compiled render (escaped)', args.renders, lambda i: get_email_template(
+        'invitation', values[i % 1000]['role']).html.render(values[i % 1000]))
+    measure('batch substitutions', args.renders, lambda i: get_email_template(
+        'invitation', values[i % 1000]['role']).html.substitutions(values[i % 1000]))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Offline throughput benchmark for the invitation email transport
+
+Sends the same set of invitation emails through FakeTransport twice: once
+as one API call per recipient (the old SendGridAPIClient-per-email model)
+and once batched through personalizations. The fake simulates per-call
+latency and a calls-per-second rate limit; rate-limited calls are retried
+after the suggested delay, the way the outbox drain would.
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda-functions'))
+
+from email_transport import EmailRateLimited, FakeTransport, chunk_recipients
+
+SAMPLE_HTML = '<p>Hi -firstName-, your code is -invitationCode-</p>'
+
+def make_recipients(count):
+    return [
+        {
+            'email': f'user{i}@example.com',
+            'subject': 'Welcome to PeerBridge - Your Investor Invitation',
+            'substitutions': {'-firstName-': f'User{i}', '-invitationCode-': f'INV{i:06X}'}
+        }
+        for i in range(count)
+    ]
+
+def send_all(transport, batches):
+    """Send every batch, backing off on rate limits; returns elapsed seconds"""
+    start = time.perf_counter()
+    for batch in batches:
+        while True:
+            try:
+                transport.send_batch('noreply@peerbridge.ai', 'Welcome', SAMPLE_HTML, batch)
+                break
+            except EmailRateLimited as e:
+                time.sleep(e.retry_after or 0.1)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--emails', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=0.05, help='seconds per API call')
+    parser.add_argument('--per-recipient-latency', type=float, default=0.0002)
+    parser.add_argument('--rate-limit', type=float, default=50, help='API calls per second')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    recipients = make_recipients(args.emails)
+    modes = {
+        'per-recipient': [[recipient] for recipient in recipients],
+        'batched': list(chunk_recipients(recipients, args.batch_size))
+    }
+
+    print(f"{args.emails} emails, {args.latency * 1000:.0f} ms/call, {args.rate_limit:g} calls/s limit")
+    print(f"{'Mode':<15} {'API calls':>10} {'Seconds':>9} {'Emails/s':>10} {'429s':>6}")
+    print("=" * 54)
+    for mode, batches in modes.items():
+        transport = FakeTransport(latency=args.latency, rate_limit=args.rate_limit,
+                                  per_recipient_latency=args.per_recipient_latency)
+        elapsed = send_all(transport, batches)
+        print(f"{mode:<15} {len(batches):>10} {elapsed:>9.2f} {args.emails / elapsed:>10,.0f} "
+              f"{transport.stats['rate_limited']:>6}")
+
+if __name__ == "__main__":
+    main()
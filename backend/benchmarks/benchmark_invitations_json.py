@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark GET /api/invitations body assembly: Postgres JSON vs Python rows
+
+Grows the invitations table to each size, then fetches the whole table as
+one page through handle_get_invitations in both INVITATIONS_JSON_MODEs and
+reports latency, body size and peak Python heap. Python serialization uses
+orjson when it is installed.
+
+Needs a scratch database in DB_HOST/DB_NAME/DB_USER/DB_PASSWORD/DB_PORT
+loaded from database/schema.sql. Generated rows are removed at the end.
+"""
+import os
+import sys
+import time
+import uuid
+import argparse
+import statistics
+import tracemalloc
+
+# Allow a single page to cover the whole table
+os.environ.setdefault('INVITATIONS_MAX_LIMIT', str(10 ** 8))
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda-functions'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'database', 'scripts'))
+
+import lambda_function_final as api
+from db_helpers import grow_table
+
+def load_rows(target, domain):
+    """Grow the table to at least target rows and refresh planner statistics"""
+    conn = api.get_db_connection()
+    cursor = conn.cursor()
+    current = grow_table(cursor, target, domain)
+    conn.commit()
+    cursor.execute("ANALYZE invitations")
+    conn.commit()
+    cursor.close()
+    api.release_db_connection(conn)
+    return current
+
+def run_mode(mode, size, repeats):
+    """Fetch one page of `size` rows; returns (median seconds, body bytes, peak heap bytes)"""
+    api.INVITATIONS_JSON_MODE = mode
+    event = {'queryStringParameters': {'limit': str(size)}}
+    timings = []
+    peak = 0
+    body_size = 0
+    for _ in range(repeats):
+        tracemalloc.start()
+        start = time.perf_counter()
+        response = api.handle_get_invitations(event, {})
+        timings.append(time.perf_counter() - start)
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        body_size = len(response['body'])
+    return statistics.median(timings), body_size, peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='10000,100000,1000000')
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    domain = f"json-bench-{uuid.uuid4().hex[:8]}.example.com"
+    encoder = 'orjson' if 'orjson' in sys.modules else 'json'
+    print(f"Python encoder: {encoder}")
+    print(f"{'Rows':>10} {'Mode':<9} {'Median ms':>10} {'Body MB':>8} {'Peak heap MB':>13}")
+    print("=" * 54)
+
+    try:
+        for size in (int(size) for size in args.sizes.split(',')):
+            load_rows(size, domain)
+            for mode in ('python', 'database'):
+                elapsed, body_size, peak = run_mode(mode, size, args.repeats)
+                print(f"{size:>10,} {mode:<9} {elapsed * 1000:>10.1f} "
+                      f"{body_size / 1e6:>8.2f} {peak / 1e6:>13.1f}")
+    finally:
+        conn = api.get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM invitations WHERE email LIKE %s", (f"%@{domain}",))
+        conn.commit()
+        cursor.close()
+        api.close_db_connection()
+
+if __name__ == "__main__":
+    main()
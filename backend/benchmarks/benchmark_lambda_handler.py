@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+End-to-end latency benchmark for lambda_handler, offline
+
+Builds synthetic API Gateway proxy events for every route and invokes
+lambda_handler in process against a local Postgres, at several invitations
+table sizes. Email goes to the in-memory FakeTransport, never SendGrid.
+Reports p50/p95/p99 latency and throughput per route, writes the results
+as JSON and, given a --baseline from an earlier run, exits non-zero when a
+route's latency regressed by more than --threshold.
+
+Needs a scratch database in DB_HOST/DB_NAME/DB_USER/DB_PASSWORD/DB_PORT.
+Pass --load-schema to load database/schema.sql into an empty database
+first. Generated rows are removed at the end.
+
+    python benchmark_lambda_handler.py --output run.json
+    python benchmark_lambda_handler.py --baseline run.json --threshold 0.2
+"""
+import os
+import sys
+import gzip
+import json
+import base64
+import time
+import uuid
+import random
+import argparse
+import platform
+import statistics
+from datetime import datetime, timezone
+
+# Fake email with a small simulated API latency; measure the stats query
+# rather than the per-container cache
+os.environ.setdefault('EMAIL_TRANSPORT', 'fake')
+os.environ.setdefault('FAKE_EMAIL_LATENCY', '0.005')
+os.environ.setdefault('DASHBOARD_STATS_TTL', '0')
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda-functions'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'database', 'scripts'))
+
+import lambda_function_final as api
+from db_helpers import grow_table
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'database', 'schema.sql')
+
+ROLES = ('entrepreneur', 'investor', 'affiliate')
+
+def proxy_event(method, path, body=None, query=None, headers=None):
+    """A minimal API Gateway REST proxy event"""
+    return {
+        'httpMethod': method,
+        'path': path,
+        'resource': '/api/{proxy+}',
+        'headers': dict({'Accept-Encoding': 'gzip', 'Content-Type': 'application/json'}, **(headers or {})),
+        'queryStringParameters': query,
+        'pathParameters': None,
+        'body': json.dumps(body) if body is not None else None,
+        'isBase64Encoded': False,
+        'requestContext': {'stage': 'bench', 'requestId': uuid.uuid4().hex}
+    }
+
+def load_schema():
+    conn = api.get_db_connection()
+    cursor = conn.cursor()
+    with open(SCHEMA_PATH) as f:
+        cursor.execute(f.read())
+    conn.commit()
+    cursor.close()
+    api.release_db_connection(conn)
+
+def load_rows(target, domain):
+    """Grow the table to at least target rows; returns (row count, sample customer IDs)"""
+    conn = api.get_db_connection()
+    cursor = conn.cursor()
+    current = grow_table(cursor, target, domain, statuses=('sent', 'sent', 'accepted', 'expired'))
+    conn.commit()
+    cursor.execute("ANALYZE invitations")
+    conn.commit()
+    cursor.execute("SELECT customer_id FROM invitations WHERE customer_id IS NOT NULL ORDER BY random() LIMIT 1000")
+    customer_ids = [row[0] for row in cursor.fetchall()]
+    conn.commit()
+    cursor.close()
+    api.release_db_connection(conn)
+    return current, customer_ids
+
+def second_page_cursor():
+    response = api.lambda_handler(proxy_event('GET', '/api/invitations', query={'limit': '100'}), None)
+    return json.loads(response_body(response)).get('nextCursor')
+
+def response_body(response):
+    body = response.get('body') or ''
+    if response.get('isBase64Encoded'):
+        body = gzip.decompress(base64.b64decode(body)).decode('utf-8')
+    return body
+
+def accept_events(sent):
+    """Accept events for the invitations the send-invitation scenario created"""
+    events = []
+    for event, response in sent:
+        if response.get('statusCode') != 200:
+            continue
+        events.append(proxy_event('POST', '/api/accept-invitation', body={
+            'email': json.loads(event['body'])['email'],
+            'invitationCode': json.loads(response_body(response))['invitationCode']
+        }))
+    return events
+
+def build_scenarios(run_id, domain, customer_ids, count):
+    """Route name -> list of events (or direct-invoke payloads), `count` each
+
+    A callable stands in for events that depend on earlier routes' responses;
+    it is called with the (event, response) pairs recorded so far, by route.
+    """
+    next_cursor = second_page_cursor()
+    sent_emails = [f'single-{run_id}-{i}@{domain}' for i in range(count)]
+    return {
+        'GET /api/dashboard-stats': [proxy_event('GET', '/api/dashboard-stats')] * count,
+        'GET /api/invitations': [proxy_event('GET', '/api/invitations', query={'limit': '100'})] * count,
+        'GET /api/invitations?cursor': [
+            proxy_event('GET', '/api/invitations', query={'limit': '100', 'cursor': next_cursor})
+        ] * count if next_cursor else [],
+        'GET /api/invitations/{customerId}': [
+            proxy_event('GET', f'/api/invitations/{random.choice(customer_ids)}') for _ in range(count)
+        ] if customer_ids else [],
+        'POST /api/send-invitation': [
+            proxy_event('POST', '/api/send-invitation', body={
+                'firstName': 'Bench', 'lastName': f'Single {i}', 'email': email, 'role': ROLES[i % 3]
+            })
+            for i, email in enumerate(sent_emails)
+        ],
+        'POST /api/send-invitations': [
+            proxy_event('POST', '/api/send-invitations', body=[
+                {'firstName': 'Bench', 'lastName': f'Bulk {i}-{j}', 'role': ROLES[j % 3],
+                 'email': f'bulk-{run_id}-{i}-{j}@{domain}'}
+                for j in range(50)
+            ])
+            for i in range(max(1, count // 10))
+        ],
+        'POST /api/accept-invitation': lambda responses: accept_events(responses['POST /api/send-invitation']),
+        'drain-email-outbox': [{'action': 'drain-email-outbox'}] * max(1, count // 10)
+    }
+
+def run_route(route, events, responses=None):
+    """Invoke lambda_handler for each event; returns (latencies in ms, errors, elapsed seconds)
+
+    (event, response) pairs are appended to `responses` when given. Exits when every
+    request failed, since its latencies would only time the error path.
+    """
+    latencies = []
+    errors = 0
+    last_error = None
+    start = time.perf_counter()
+    for event in events:
+        began = time.perf_counter()
+        try:
+            response = api.lambda_handler(event, None)
+            if 'statusCode' in response and response['statusCode'] >= 400:
+                errors += 1
+                last_error = f"{response['statusCode']} {response_body(response)}"
+        except Exception as e:
+            response = None
+            errors += 1
+            last_error = repr(e)
+        latencies.append((time.perf_counter() - began) * 1000)
+        if responses is not None and response is not None:
+            responses.append((event, response))
+    elapsed = time.perf_counter() - start
+    if events and errors == len(events):
+        raise SystemExit(f"❌ All {errors} {route} requests failed; last error: {last_error}")
+    return latencies, errors, elapsed
+
+def summarize(latencies, errors, elapsed):
+    if len(latencies) > 1:
+        cuts = statistics.quantiles(latencies, n=100, method='inclusive')
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = latencies[0]
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'p50_ms': round(p50, 3),
+        'p95_ms': round(p95, 3),
+        'p99_ms': round(p99, 3),
+        'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else None
+    }
+
+def find_regressions(results, baseline, metric, threshold):
+    """Routes whose `metric` grew by more than threshold (a fraction) over the baseline"""
+    regressions = []
+    for size, routes in results.items():
+        for route, current in routes.items():
+            previous = baseline.get('results', {}).get(size, {}).get(route)
+            if not previous or not previous.get(metric):
+                continue
+            change = current[metric] / previous[metric] - 1
+            if change > threshold:
+                regressions.append((size, route, previous[metric], current[metric], change))
+    return regressions
+
+def cleanup(domain):
+    conn = api.get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM email_logs WHERE recipient_email LIKE %s", (f"%@{domain}",))
+    cursor.execute("DELETE FROM invitations WHERE email LIKE %s", (f"%@{domain}",))
+    conn.commit()
+    cursor.close()
+    api.close_db_connection()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='1000,10000,100000')
+    parser.add_argument('--requests', type=int, default=200, help='requests per route and size')
+    parser.add_argument('--warmup', type=int, default=5, help='untimed requests per route first')
+    parser.add_argument('--output', help='write results JSON here')
+    parser.add_argument('--baseline', help='results JSON from an earlier run to compare against')
+    parser.add_argument('--metric', default='p95_ms', choices=('p50_ms', 'p95_ms', 'p99_ms'))
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='allowed fractional increase over the baseline (0.2 = 20%%)')
+    parser.add_argument('--load-schema', action='store_true', help='load database/schema.sql first')
+    args = parser.parse_args()
+
+    random.seed(42)
+    if args.load_schema:
+        load_schema()
+    api.initialize_database()
+
+    run_id = uuid.uuid4().hex[:8]
+    domain = f"e2e-bench-{run_id}.example.com"
+    results = {}
+
+    print(f"{'Rows':>8} {'Route':<34} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'req/s':>8} {'err':>4}")
+    print("=" * 84)
+    try:
+        for size in (int(size) for size in args.sizes.split(',')):
+            rows, customer_ids = load_rows(size, domain)
+            scenarios = build_scenarios(f'{run_id}-{size}', domain, customer_ids, args.requests)
+            results[str(size)] = {}
+            responses = {}
+            for route, events in scenarios.items():
+                if callable(events):
+                    events = events(responses)
+                if not events:
+                    continue
+                # Warm up with read-only routes only; writes would shift the data
+                if route.startswith('GET'):
+                    run_route(route, events[:args.warmup])
+                summary = summarize(*run_route(route, events, responses.setdefault(route, [])))
+                results[str(size)][route] = summary
+                print(f"{rows:>8,} {route:<34} {summary['p50_ms']:>8.2f} {summary['p95_ms']:>8.2f} "
+                      f"{summary['p99_ms']:>8.2f} {summary['throughput_rps']:>8,.0f} {summary['errors']:>4}")
+    finally:
+        cleanup(domain)
+
+    document = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'python': platform.python_version(),
+            'requests_per_route': args.requests,
+            'json_mode': api.INVITATIONS_JSON_MODE
+        },
+        'results': results
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(document, f, indent=2)
+        print(f"\n📄 Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.metric, args.threshold)
+        if regressions:
+            print(f"\n❌ {len(regressions)} route(s) regressed more than {args.threshold:.0%} on {args.metric}:")
+            for size, route, before, after, change in regressions:
+                print(f"   {size:>8} rows  {route:<34} {before:.2f} -> {after:.2f} ms (+{change:.0%})")
+            sys.exit(1)
+        print(f"\n✅ No {args.metric} regression beyond {args.threshold:.0%} against {args.baseline}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Measure the planning time prepared statements save per request
+
+Runs each hot route once through lambda_handler and records the registry
+statements it executes. For every statement it then compares the
+planner's own Planning Time (EXPLAIN (SUMMARY), which does not run the
+query) for the plain SQL against EXECUTE of the prepared statement on a
+warm connection, past the five custom plans Postgres makes before it
+settles on a generic plan. Planning Time is summed per route, and each
+route's end-to-end handler latency is timed with prepared statements off
+and on.
+
+Needs a database in DB_HOST/DB_NAME/DB_USER/DB_PASSWORD/DB_PORT loaded from
+database/schema.sql. Invitations it creates are removed at the end.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import argparse
+import statistics
+
+os.environ.setdefault('EMAIL_TRANSPORT', 'fake')
+os.environ.setdefault('DASHBOARD_STATS_TTL', '0')
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda-functions'))
+
+import psycopg2
+
+import lambda_function_final as api
+import prepared_statements
+
+recorded = []
+
+class RecordingCursor(api.TimedCursor):
+    """Keeps every registry statement the handlers run, with its parameters"""
+
+    def execute(self, query, vars=None):
+        if query in prepared_statements.registered_queries():
+            recorded.append((query, vars))
+        return super().execute(query, vars)
+
+class SingleConnection:
+    """Pool interface over one long-lived connection"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def getconn(self, key=None):
+        return self.conn
+
+    def putconn(self, conn, key=None, close=False):
+        if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            conn.rollback()
+
+    def stats(self):
+        return {}
+
+def proxy_event(method, path, body=None, query=None):
+    return {
+        'httpMethod': method,
+        'path': path,
+        'headers': {'Content-Type': 'application/json'},
+        'queryStringParameters': query,
+        'pathParameters': None,
+        'body': json.dumps(body) if body is not None else None,
+        'isBase64Encoded': False,
+        'requestContext': {'stage': 'bench', 'requestId': uuid.uuid4().hex}
+    }
+
+def route_events(domain):
+    """(route, event factory) for the hot routes, in an order where each can succeed"""
+    created = api.lambda_handler(proxy_event('POST', '/api/send-invitation', {
+        'firstName': 'Bench', 'lastName': 'Prepared', 'email': f'seed@{domain}', 'role': 'investor'
+    }), None)
+    seed = json.loads(created['body'])
+    first_page = json.loads(api.lambda_handler(proxy_event('GET', '/api/invitations'), None)['body'])
+    sends = iter(range(10 ** 9))
+
+    return [
+        ('GET /api/dashboard-stats', lambda: proxy_event('GET', '/api/dashboard-stats')),
+        ('GET /api/invitations', lambda: proxy_event('GET', '/api/invitations', query={'limit': '50'})),
+        ('GET /api/invitations (filtered)', lambda: proxy_event('GET', '/api/invitations', query={
+            'limit': '50', 'status': 'sent,pending', 'q': 'bench'})),
+        ('GET /api/invitations?since', lambda: proxy_event('GET', '/api/invitations', query={
+            'since': first_page['syncToken']})),
+        ('GET /api/invitations/{customerId}', lambda: proxy_event(
+            'GET', f"/api/invitations/{seed['customerId']}")),
+        ('POST /api/send-invitation', lambda: proxy_event('POST', '/api/send-invitation', {
+            'firstName': 'Bench', 'lastName': 'Prepared', 'email': f'send-{next(sends)}@{domain}',
+            'role': 'entrepreneur'})),
+        ('POST /api/accept-invitation', lambda: proxy_event('POST', '/api/accept-invitation', {
+            'email': f'seed@{domain}', 'invitationCode': seed['invitationCode']})),
+    ]
+
+def planning_ms(cursor, statement, params):
+    cursor.execute(f"EXPLAIN (SUMMARY, FORMAT JSON) {statement}", params)
+    plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]['Planning Time']
+
+def compare_planning(conn, query, params, repeats):
+    """Median planning ms for (plain SQL, prepared statement on a warm connection)"""
+    cursor = conn.cursor()
+    plain = statistics.median(planning_ms(cursor, query, params) for _ in range(repeats))
+
+    name = prepared_statements.prepare(cursor, query)
+    arguments = f" ({', '.join(['%s'] * len(params))})" if params else ""
+    execute = f"EXECUTE {name}{arguments}"
+    for _ in range(6):
+        planning_ms(cursor, execute, params)
+    prepared = statistics.median(planning_ms(cursor, execute, params) for _ in range(repeats))
+    conn.rollback()
+    cursor.close()
+    return plain, prepared
+
+def handler_latency(make_event, enabled, repeats):
+    prepared_statements.PREPARED_STATEMENTS_ENABLED = enabled
+    timings = []
+    for _ in range(repeats):
+        event = make_event()
+        start = time.perf_counter()
+        api.lambda_handler(event, None)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeats', type=int, default=50, help='measurements per statement and route')
+    args = parser.parse_args()
+
+    api.logger.setLevel(os.environ.get('LOG_LEVEL', 'WARNING'))
+    conn = psycopg2.connect(**dict(api.db_connect_kwargs(), cursor_factory=RecordingCursor))
+    api.set_db_pool(SingleConnection(conn))
+    api.initialize_database()
+    domain = f"prepared-bench-{uuid.uuid4().hex[:8]}.example.com"
+
+    print(f"{'Route':<34} {'stmts':>5} {'plan ms':>8} {'prepared':>9} {'saved':>7} "
+          f"{'req ms off':>11} {'req ms on':>10}")
+    print("=" * 90)
+    total_saved = []
+    try:
+        prepared_statements.PREPARED_STATEMENTS_ENABLED = False
+        routes = route_events(domain)
+        for route, make_event in routes:
+            prepared_statements.PREPARED_STATEMENTS_ENABLED = False
+            recorded.clear()
+            api.lambda_handler(make_event(), None)
+            statements = list(recorded)
+
+            plain = prepared = 0.0
+            for query, params in statements:
+                plain_ms, prepared_ms = compare_planning(conn, query, params, args.repeats)
+                plain += plain_ms
+                prepared += prepared_ms
+
+            off = handler_latency(make_event, False, args.repeats)
+            on = handler_latency(make_event, True, args.repeats)
+            total_saved.append(plain - prepared)
+            print(f"{route:<34} {len(statements):>5} {plain:>8.3f} {prepared:>9.3f} {plain - prepared:>7.3f} "
+                  f"{off:>11.2f} {on:>10.2f}")
+    finally:
+        conn.rollback()
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM email_logs WHERE recipient_email LIKE %s", (f"%@{domain}",))
+        cursor.execute("DELETE FROM invitations WHERE email LIKE %s", (f"%@{domain}",))
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+    print(f"\nPlanning time saved per request: {statistics.mean(total_saved):.3f} ms on average "
+          f"across {len(total_saved)} routes ({len(conn.prepared_statements)} statements prepared)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Check that the server's connection pool reuses its connections
+
+Checks connections out of a BoundedConnectionPool one at a time and then
+from several threads at once, and fails unless returned connections come
+back on the next checkout and the pool never opens more than its size.
+It also checks a pool that opens nothing up front, like the server's
+read-replica pool.
+
+Needs a database in DB_HOST/DB_NAME/DB_USER/DB_PASSWORD/DB_PORT; with
+--replica, the one in DATABASE_READ_URL or DB_READ_HOST/DB_READ_PORT.
+"""
+import os
+import sys
+import argparse
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda-functions'))
+
+import lambda_function_final as api
+from db_pool import BoundedConnectionPool
+
+def checkout_worker(pool, checkouts, seen):
+    for _ in range(checkouts):
+        conn = pool.getconn()
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1")
+        cursor.close()
+        seen.append(id(conn))
+        pool.putconn(conn)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--pool-size', type=int, default=5, help='pool maxconn')
+    parser.add_argument('--checkouts', type=int, default=50, help='checkouts in the concurrent phase')
+    parser.add_argument('--replica', action='store_true', help='connect to the read replica instead')
+    args = parser.parse_args()
+
+    connect_kwargs = api.db_read_connect_kwargs() if args.replica else api.db_connect_kwargs()
+
+    results = []
+
+    def check(name, passed):
+        results.append(passed)
+        print(f"{'✅' if passed else '❌'} {name}")
+
+    pool = BoundedConnectionPool(1, args.pool_size, **connect_kwargs)
+    try:
+        first = pool.getconn()
+        pool.putconn(first)
+        again = pool.getconn()
+        pool.putconn(again)
+        check("A returned connection comes back on the next checkout", again is first)
+
+        # Hold pool-size connections at once, so the pool has that many idle afterwards
+        held = [pool.getconn() for _ in range(args.pool_size)]
+        for conn in held:
+            pool.putconn(conn)
+        check(f"All {args.pool_size} returned connections stay open",
+              len(pool._pool) == args.pool_size and not any(conn.closed for conn in held))
+
+        seen = []
+        per_thread = args.checkouts // args.pool_size
+        workers = [threading.Thread(target=checkout_worker, args=(pool, per_thread, seen))
+                   for _ in range(args.pool_size)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        stats = pool.stats()
+        check(f"{len(seen)} concurrent checkouts reuse the pool's connections "
+              f"({stats['connects']} opened in total)",
+              stats['connects'] <= args.pool_size and set(seen) <= {id(conn) for conn in held})
+    finally:
+        pool.closeall()
+
+    # The server's read pool is BoundedConnectionPool(0, DB_POOL_SIZE)
+    lazy = BoundedConnectionPool(0, args.pool_size, **connect_kwargs)
+    try:
+        first = lazy.getconn()
+        lazy.putconn(first)
+        again = lazy.getconn()
+        lazy.putconn(again)
+        check("A pool opened with minconn=0 keeps its returned connection",
+              again is first and not first.closed and lazy.stats()['connects'] == 1)
+    finally:
+        lazy.closeall()
+
+    print(f"\n{sum(results)}/{len(results)} checks passed")
+    if not all(results):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Check that both INVITATIONS_JSON_MODEs, delta sync and the single-invitation
+route serialize invitations identically
+
+Inserts invitations with awkward timestamps (whole seconds, a non-UTC
+offset, an accepted_on) under a session time zone other than UTC, then
+fetches them as a page in the 'database' and 'python' modes, through
+GET /api/invitations?since= and through GET /api/invitations/{customerId},
+and fails unless every route returns the same payload for each invitation.
+
+Needs a database in DB_HOST/DB_NAME/DB_USER/DB_PASSWORD/DB_PORT loaded from
+database/schema.sql. Invitations it creates are removed at the end.
+"""
+import os
+import re
+import sys
+import json
+import uuid
+
+# Serialization must not depend on the session time zone
+os.environ.setdefault('PGTZ', 'America/New_York')
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda-functions'))
+
+import psycopg2
+
+import lambda_function_final as api
+
+TIMESTAMP_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}\.\d{6}Z$')
+
+# (first name, invited_on, accepted_on)
+ROWS = (
+    ('Micro', '2026-10-18 02:04:14.409345+00', None),
+    ('Whole', '2026-10-18 02:04:15+00', None),
+    ('Offset', '2026-10-18 04:04:16.5+02', '2026-10-18 05:00:00+02'),
+    ('O\'Brien "Quoted"', '2026-10-17 23:59:59.999999-05', None),
+)
+
+def get(path, query=None):
+    event = {
+        'httpMethod': 'GET',
+        'path': path,
+        'headers': {},
+        'queryStringParameters': query,
+        'pathParameters': None,
+        'body': None,
+        'isBase64Encoded': False,
+        'requestContext': {'stage': 'check', 'requestId': uuid.uuid4().hex}
+    }
+    response = api.lambda_handler(event, None)
+    return response['statusCode'], json.loads(response['body'])
+
+def page(mode, domain):
+    api.INVITATIONS_JSON_MODE = mode
+    status, body = get('/api/invitations', {'q': domain, 'limit': str(len(ROWS))})
+    return body['invitations'] if status == 200 else None
+
+def main():
+    api.logger.setLevel(os.environ.get('LOG_LEVEL', 'CRITICAL'))
+    conn = psycopg2.connect(**api.db_connect_kwargs())
+    domain = f"json-check-{uuid.uuid4().hex[:8]}.example.com"
+
+    results = []
+
+    def check(name, passed):
+        results.append(bool(passed))
+        print(f"{'✅' if passed else '❌'} {name}")
+
+    try:
+        _, first_page = get('/api/invitations', {'limit': '1'})
+        since = first_page['syncToken']
+
+        cursor = conn.cursor()
+        for i, (first_name, invited_on, accepted_on) in enumerate(ROWS):
+            cursor.execute("""
+                INSERT INTO invitations (first_name, last_name, email, role, status, invited_on, accepted_on)
+                VALUES (%s, 'Check', %s, 'investor', %s, %s, %s)
+            """, (first_name, f"row-{i}@{domain}", 'accepted' if accepted_on else 'sent',
+                  invited_on, accepted_on))
+        conn.commit()
+        cursor.close()
+
+        in_database, in_python = page('database', domain), page('python', domain)
+        check(f"The database JSON mode returns all {len(ROWS)} invitations",
+              in_database is not None and len(in_database) == len(ROWS))
+        check("The python JSON mode returns the same payload", in_python == in_database)
+
+        timestamps = [row[field] for row in in_database or () for field in ('invitedOn', 'acceptedOn')
+                      if row[field] is not None]
+        check("Timestamps are UTC ISO 8601 with microseconds",
+              timestamps and all(TIMESTAMP_PATTERN.match(value) for value in timestamps))
+
+        expected = {row['customerId']: row for row in in_database or ()}
+        _, synced = get('/api/invitations', {'since': since})
+        synced = {row['customerId']: row for row in synced.get('invitations', ()) if row['customerId'] in expected}
+        check("Delta sync returns the same payload for each invitation", synced == expected)
+
+        singles = {customer_id: get(f'/api/invitations/{customer_id}')[1] for customer_id in expected}
+        check("GET /api/invitations/{customerId} returns the same payload", singles == expected)
+    finally:
+        conn.rollback()
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM invitations WHERE email LIKE %s", (f"%@{domain}",))
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+    print(f"\n{sum(results)}/{len(results)} checks passed")
+    if not all(results):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
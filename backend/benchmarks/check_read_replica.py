@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Check read-replica routing against two local Postgres instances
+
+Treats the database in DB_HOST/DB_NAME/DB_USER/DB_PASSWORD/DB_PORT as the
+primary and the one in DATABASE_READ_URL (or DB_READ_HOST/DB_READ_PORT) as
+the replica. They are two independent instances, both loaded from
+database/schema.sql - no replication - so a row that exists in only one of
+them shows which database served a request:
+
+    docker run -d -p 5432:5432 -e POSTGRES_PASSWORD=pb postgres:16
+    docker run -d -p 5433:5432 -e POSTGRES_PASSWORD=pb postgres:16
+    DB_HOST=localhost DB_READ_HOST=localhost DB_READ_PORT=5433 ... python check_read_replica.py
+
+It checks that GET routes read from the replica, that writes and the reads
+right after them (the DB_READ_AFTER_WRITE_WINDOW, and ?consistent=1)
+go to the primary, and that reads fall back to the primary when the
+replica cannot be reached. Rows it creates are removed at the end.
+"""
+import os
+import sys
+import json
+import time
+import uuid
+import argparse
+
+os.environ.setdefault('EMAIL_TRANSPORT', 'fake')
+os.environ.setdefault('DASHBOARD_STATS_TTL', '0')
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda-functions'))
+
+import psycopg2
+
+import lambda_function_final as api
+
+def proxy_event(method, path, body=None, query=None):
+    return {
+        'httpMethod': method,
+        'path': path,
+        'headers': {'Content-Type': 'application/json'},
+        'queryStringParameters': query,
+        'pathParameters': None,
+        'body': json.dumps(body) if body is not None else None,
+        'isBase64Encoded': False,
+        'requestContext': {'stage': 'check', 'requestId': uuid.uuid4().hex}
+    }
+
+def get_email(customer_id, query=None):
+    """Email of the invitation the API returns for customer_id, or None
+
+    Both instances hand out customer IDs from their own sequence, so the same
+    ID can name different invitations - the email tells them apart.
+    """
+    response = api.lambda_handler(proxy_event('GET', f'/api/invitations/{customer_id}', query=query), None)
+    return json.loads(response['body']).get('email') if response['statusCode'] == 200 else None
+
+def insert_invitation(conn, email):
+    cursor = conn.cursor()
+    cursor.execute("""
+        INSERT INTO invitations (first_name, last_name, email, role, status)
+        VALUES ('Replica', 'Check', %s, 'investor', 'sent')
+        RETURNING customer_id
+    """, (email,))
+    customer_id = cursor.fetchone()[0]
+    conn.commit()
+    cursor.close()
+    return customer_id
+
+def invitation_exists(conn, email):
+    cursor = conn.cursor()
+    cursor.execute("SELECT 1 FROM invitations WHERE email = %s", (email,))
+    found = cursor.fetchone() is not None
+    conn.rollback()
+    cursor.close()
+    return found
+
+def remove_invitations(conn, domain):
+    conn.rollback()
+    cursor = conn.cursor()
+    cursor.execute("DELETE FROM email_logs WHERE recipient_email LIKE %s", (f"%@{domain}",))
+    cursor.execute("DELETE FROM invitations WHERE email LIKE %s", (f"%@{domain}",))
+    conn.commit()
+    cursor.close()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--window', type=float, default=1.0,
+                        help='read-after-write window to check, in seconds')
+    parser.add_argument('--dead-port', type=int, default=1,
+                        help='local port with nothing listening, for the fallback check')
+    args = parser.parse_args()
+
+    if not api.read_replica_configured():
+        sys.exit("Set DATABASE_READ_URL or DB_READ_HOST (and DB_READ_PORT) to the second instance")
+
+    api.logger.setLevel(os.environ.get('LOG_LEVEL', 'ERROR'))
+    api.DB_READ_AFTER_WRITE_WINDOW = args.window
+    primary = psycopg2.connect(**api.db_connect_kwargs())
+    replica = psycopg2.connect(**api.db_read_connect_kwargs())
+    domain = f"replica-check-{uuid.uuid4().hex[:8]}.example.com"
+
+    results = []
+
+    def check(name, passed):
+        results.append(passed)
+        print(f"{'✅' if passed else '❌'} {name}")
+
+    try:
+        marker_email, write_email = f"marker@{domain}", f"write@{domain}"
+        marker = insert_invitation(replica, marker_email)
+
+        check("GET /api/invitations/{customerId} reads from the replica", get_email(marker) == marker_email)
+        check("?consistent=1 reads from the primary", get_email(marker, {'consistent': '1'}) != marker_email)
+
+        page = json.loads(api.lambda_handler(proxy_event('GET', '/api/invitations'), None)['body'])
+        check("GET /api/invitations reads from the replica",
+              any(row.get('email') == marker_email for row in page['invitations']))
+
+        cursor = replica.cursor()
+        cursor.execute("SELECT total_invitations FROM invitation_stats")
+        replica_total = cursor.fetchone()[0]
+        replica.rollback()
+        cursor.close()
+        stats = json.loads(api.lambda_handler(proxy_event('GET', '/api/dashboard-stats'), None)['body'])
+        check("GET /api/dashboard-stats reads from the replica",
+              stats['totalInvitationsSent'] == replica_total)
+
+        created = api.lambda_handler(proxy_event('POST', '/api/send-invitation', {
+            'firstName': 'Replica', 'lastName': 'Check', 'email': write_email, 'role': 'investor'
+        }), None)
+        written = json.loads(created['body'])
+        check("POST /api/send-invitation writes to the primary",
+              created['statusCode'] in (200, 201) and invitation_exists(primary, write_email)
+              and not invitation_exists(replica, write_email))
+
+        check("Read right after the write goes to the primary", get_email(written['customerId']) == write_email)
+        time.sleep(args.window)
+        check(f"Read {args.window:g}s after the write goes to the replica again",
+              get_email(written['customerId']) != write_email)
+
+        api.close_db_connection('replica')
+        api.DATABASE_READ_URL = None
+        api.DB_READ_HOST, api.DB_READ_PORT = '127.0.0.1', args.dead_port
+        fallbacks = api.get_db_connection_stats()['replica_fallbacks']
+        check("Unreachable replica falls back to the primary",
+              get_email(marker) != marker_email and get_email(written['customerId']) == write_email
+              and api.get_db_connection_stats()['replica_fallbacks'] == fallbacks + 1)
+    finally:
+        api.close_db_connection()
+        remove_invitations(replica, domain)
+        remove_invitations(primary, domain)
+        replica.close()
+        primary.close()
+
+    print(f"\n{sum(results)}/{len(results)} checks passed; connection stats: {api.get_db_connection_stats()}")
+    if not all(results):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
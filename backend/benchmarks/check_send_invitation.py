@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Check that POST /api/send-invitation never reports a lost invitation as sent
+
+The invitation row and its queued email are written in one transaction.
+This sends one invitation normally, then makes the email enqueue fail
+after the insert and makes the database unreachable, and checks that both
+failures return 503 and leave neither an invitation nor a queued email.
+
+Needs a database in DB_HOST/DB_NAME/DB_USER/DB_PASSWORD/DB_PORT loaded from
+database/schema.sql. Invitations it creates are removed at the end.
+"""
+import os
+import sys
+import json
+import uuid
+import argparse
+
+os.environ.setdefault('EMAIL_TRANSPORT', 'fake')
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda-functions'))
+
+import psycopg2
+
+import lambda_function_final as api
+
+def send(email, role='investor'):
+    event = {
+        'httpMethod': 'POST',
+        'path': '/api/send-invitation',
+        'headers': {'Content-Type': 'application/json'},
+        'queryStringParameters': None,
+        'pathParameters': None,
+        'body': json.dumps({'firstName': 'Send', 'lastName': 'Check', 'email': email, 'role': role}),
+        'isBase64Encoded': False,
+        'requestContext': {'stage': 'check', 'requestId': uuid.uuid4().hex}
+    }
+    response = api.lambda_handler(event, None)
+    return response['statusCode'], json.loads(response['body'])
+
+def stored(conn, email):
+    """(invitation rows, queued emails) for an address"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM invitations WHERE email = %s", (email,))
+    invitations = cursor.fetchone()[0]
+    cursor.execute("SELECT COUNT(*) FROM email_logs WHERE recipient_email = %s", (email,))
+    emails = cursor.fetchone()[0]
+    conn.rollback()
+    cursor.close()
+    return invitations, emails
+
+def failing_enqueue(cursor, recipients):
+    raise psycopg2.OperationalError("simulated failure after the insert")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--dead-port', type=int, default=1,
+                        help='local port with nothing listening, for the unreachable-database check')
+    args = parser.parse_args()
+
+    api.logger.setLevel(os.environ.get('LOG_LEVEL', 'CRITICAL'))
+    conn = psycopg2.connect(**api.db_connect_kwargs())
+    domain = f"send-check-{uuid.uuid4().hex[:8]}.example.com"
+
+    results = []
+
+    def check(name, passed):
+        results.append(bool(passed))
+        print(f"{'✅' if passed else '❌'} {name}")
+
+    try:
+        email = f"ok@{domain}"
+        status, body = send(email)
+        check("A successful send returns 200 with the invitation's IDs",
+              status == 200 and body['customerId'] and body['invitationCode'])
+        check("  ... and stores the invitation with its queued email", stored(conn, email) == (1, 1))
+
+        status, body = send(f"role@{domain}", role='admin')
+        check("An invalid role returns 400", status == 400)
+
+        email = f"enqueue@{domain}"
+        enqueue = api.enqueue_invitation_emails
+        api.enqueue_invitation_emails = failing_enqueue
+        try:
+            status, body = send(email)
+        finally:
+            api.enqueue_invitation_emails = enqueue
+        check("A failure after the insert returns 503", status == 503 and 'customerId' not in body)
+        check("  ... and rolls the invitation back", stored(conn, email) == (0, 0))
+
+        email = f"down@{domain}"
+        api.close_db_connection()
+        port = api.DB_PORT
+        api.DB_PORT = args.dead_port
+        try:
+            status, body = send(email)
+        finally:
+            api.DB_PORT = port
+            api.close_db_connection()
+        check("An unreachable database returns 503", status == 503)
+        check("  ... and stores nothing", stored(conn, email) == (0, 0))
+
+        status, body = send(f"after@{domain}")
+        check("The next send succeeds again", status == 200)
+    finally:
+        conn.rollback()
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM email_logs WHERE recipient_email LIKE %s", (f"%@{domain}",))
+        cursor.execute("DELETE FROM invitations WHERE email LIKE %s", (f"%@{domain}",))
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+    print(f"\n{sum(results)}/{len(results)} checks passed")
+    if not all(results):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
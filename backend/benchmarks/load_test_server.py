@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Load test the standalone server: shared connection pool vs connect-per-request
+
+Starts server.py in process twice on a free port - once with the bounded
+ThreadedConnectionPool, once opening a fresh connection for every
+get_db_connection() - and drives each with concurrent clients issuing a
+mix of read requests for a fixed duration. The server closes the connection
+after each response, so every request includes a TCP connect. Reports requests/s,
+latency percentiles and the pool's queue-wait metrics.
+
+Needs a database in DB_HOST/DB_NAME/DB_USER/DB_PASSWORD/DB_PORT loaded from
+database/schema.sql. Only reads are issued, so no cleanup is needed.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import threading
+import statistics
+import http.client
+
+# Every request should reach the database
+os.environ.setdefault('DASHBOARD_STATS_TTL', '0')
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lambda-functions'))
+
+import lambda_function_final as api
+import server
+from db_pool import BoundedConnectionPool, PerRequestConnections
+
+def sample_customer_ids():
+    conn = api.get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("SELECT customer_id FROM invitations WHERE customer_id IS NOT NULL LIMIT 500")
+    ids = [row[0] for row in cursor.fetchall()]
+    cursor.close()
+    api.release_db_connection(conn)
+    return ids
+
+def request_paths(customer_ids):
+    paths = ['/api/dashboard-stats', '/api/invitations?limit=50']
+    return paths + [f'/api/invitations/{customer_id}' for customer_id in customer_ids[:20]]
+
+def client(port, paths, deadline, latencies, errors):
+    """One client issuing random reads until the deadline (http.client reconnects as needed)"""
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            conn.request('GET', random.choice(paths))
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 500:
+                errors.append(response.status)
+        except Exception as e:
+            errors.append(str(e))
+            conn.close()
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+    conn.close()
+
+def run(label, pool, paths, clients, threads, duration):
+    srv = server.create_server('127.0.0.1', 0, threads, pool=pool)
+    port = srv.server_address[1]
+    serving = threading.Thread(target=srv.serve_forever, daemon=True)
+    serving.start()
+
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    workers = [threading.Thread(target=client, args=(port, paths, deadline, latencies, errors))
+               for _ in range(clients)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    srv.shutdown()
+    srv.server_close()
+    pool.closeall()
+
+    cuts = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0.0] * 99
+    print(f"{label:<18} {len(latencies) / elapsed:>9,.0f} {cuts[49]:>8.2f} {cuts[94]:>8.2f} "
+          f"{cuts[98]:>8.2f} {len(errors):>7}")
+    return pool.stats()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clients', type=int, default=32, help='concurrent HTTP clients')
+    parser.add_argument('--threads', type=int, default=16, help='server worker threads')
+    parser.add_argument('--pool-size', type=int, default=5, help='database connections in the pool')
+    parser.add_argument('--duration', type=float, default=15, help='seconds per mode')
+    args = parser.parse_args()
+
+    # Per-request INFO logging would dominate the measurement
+    api.logger.setLevel(os.environ.get('LOG_LEVEL', 'WARNING'))
+
+    random.seed(7)
+    paths = request_paths(sample_customer_ids())
+    api.close_db_connection()
+
+    print(f"{args.clients} clients, {args.threads} server threads, {args.duration:g}s per mode")
+    print(f"{'Mode':<18} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    print("=" * 62)
+    pooled = run('pool', BoundedConnectionPool(1, args.pool_size, **api.db_connect_kwargs()),
+                 paths, args.clients, args.threads, args.duration)
+    per_request = run('connect/request', PerRequestConnections(**api.db_connect_kwargs()),
+                      paths, args.clients, args.threads, args.duration)
+
+    print(f"\nPool ({pooled['size']} connections): {pooled['checkouts']:,} checkouts, "
+          f"{pooled['waits']:,} waited, avg wait {pooled['wait_ms_avg']:.2f} ms, "
+          f"max wait {pooled['wait_ms_max']:.1f} ms, {pooled['timeouts']} timeouts, "
+          f"{pooled['connects']:,} connections opened")
+    print(f"Connect-per-request: {per_request['connects']:,} connections opened")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Build the Lambda deployment zip and check its cold-start import cost
+
+Copies the handler module and the local modules it uses into a build
+directory, installs requirements.txt there and precompiles everything
+(Lambda's filesystem is read-only, so modules without a usable .pyc are
+compiled on every cold start). It then imports the handler in fresh
+interpreters under `python -X importtime`, prints the costliest modules,
+and fails when the median cold import exceeds --budget-ms or when a module
+that only some routes need is imported at cold start.
+
+    python backend/build_lambda.py --output lambda-deployment.zip
+    python backend/build_lambda.py --check-only   # source tree, installed deps
+"""
+import os
+import sys
+import shutil
+import zipfile
+import argparse
+import tempfile
+import compileall
+import statistics
+import subprocess
+import py_compile
+
+LAMBDA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'lambda-functions')
+
+# Handler: lambda_function_final.lambda_handler
+ENTRY_MODULE = 'lambda_function_final'
+
+# Everything the handler (and the optional asyncio handler) imports from this repo
+PACKAGE_MODULES = (
+    'lambda_function_final.py',
+    'routes.py',
+    'metrics.py',
+    'prepared_statements.py',
+    'email_templates.py',
+    'email_transport.py',
+    'async_handlers.py',
+)
+
+# Loaded on first use by the routes that need them - never imported at cold
+# start by this repo's modules. What a dependency imports is not ours to defer:
+# psycopg2's C extension loads ssl, for one.
+DEFERRED_MODULES = (
+    'email_templates',
+    'email_transport',
+    'http.client',
+    'asyncio',
+    'inspect',
+    'csv',
+    'gzip',
+    'brotli',
+    'psycopg2.extras',
+    'asyncpg',
+    'aiohttp',
+)
+
+# The Lambda runtime's Python (Runtime: python3.11); .pyc files are version specific
+LAMBDA_PYTHON = (3, 11)
+
+def build(build_dir):
+    """Copy the handler modules, install dependencies and precompile"""
+    for module in PACKAGE_MODULES:
+        shutil.copy2(os.path.join(LAMBDA_DIR, module), build_dir)
+    subprocess.run([sys.executable, '-m', 'pip', 'install', '--quiet', '--target', build_dir,
+                    '-r', os.path.join(LAMBDA_DIR, 'requirements.txt')], check=True)
+
+    if sys.version_info[:2] == LAMBDA_PYTHON:
+        # Unchecked-hash .pyc files, so zip timestamps can't invalidate them
+        compileall.compile_dir(build_dir, quiet=1,
+                               invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH)
+    else:
+        print(f"⚠️  Building with Python {sys.version_info[0]}.{sys.version_info[1]}, not "
+              f"{LAMBDA_PYTHON[0]}.{LAMBDA_PYTHON[1]} - no .pyc files bundled; Lambda will "
+              f"compile modules on every cold start")
+
+def write_zip(build_dir, output):
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for root, _, files in os.walk(build_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                archive.write(path, os.path.relpath(path, build_dir))
+    return os.path.getsize(output)
+
+def import_times(directory, module):
+    """One cold import under -X importtime: [(module, depth, self_us, cumulative_us)]"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=directory, capture_output=True, text=True,
+        env=dict(os.environ, PYTHONPATH=directory)
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        entries.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    return entries
+
+def importers(entries):
+    """Module -> the module whose import loaded it (None for the top-level import)
+
+    -X importtime lists each module after the modules its import loaded, one
+    level deeper, so a module is the importer of the deeper entries before it.
+    """
+    parents = {}
+    waiting = {}
+    for name, depth, _, _ in entries:
+        for child in waiting.pop(depth + 1, ()):
+            parents[child] = name
+        waiting.setdefault(depth, []).append(name)
+    for name in waiting.get(0, ()):
+        parents[name] = None
+    return parents
+
+def profile(directory, module, runs):
+    """Median cold import over several runs, with per-module medians and importers"""
+    import_times(directory, module)  # writes any missing .pyc files
+    samples = [import_times(directory, module) for _ in range(runs)]
+
+    totals = [next(c for name, _, _, c in entries if name == module) for entries in samples]
+    per_module = {}
+    for entries in samples:
+        for name, depth, self_us, cumulative_us in entries:
+            per_module.setdefault(name, (depth, [], []))
+            per_module[name][1].append(self_us)
+            per_module[name][2].append(cumulative_us)
+    modules = [(name, depth, statistics.median(selfs), statistics.median(cumulatives))
+               for name, (depth, selfs, cumulatives) in per_module.items()]
+    return statistics.median(totals), modules, importers(samples[0])
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--output', default='lambda-deployment.zip', help='zip file to write')
+    parser.add_argument('--budget-ms', type=float, default=float(os.environ.get('IMPORT_TIME_BUDGET_MS', 150)),
+                        help='fail when the cold import takes longer (median)')
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters to time')
+    parser.add_argument('--top', type=int, default=20, help='modules to list')
+    parser.add_argument('--check-only', action='store_true',
+                        help='time the source tree with installed dependencies; build nothing')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='peerbridge-lambda-') as build_dir:
+        if args.check_only:
+            directory = LAMBDA_DIR
+        else:
+            build(build_dir)
+            directory = build_dir
+
+        total_us, modules, parents = profile(directory, ENTRY_MODULE, args.runs)
+
+        if not args.check_only:
+            size = write_zip(build_dir, args.output)
+            print(f"📦 {args.output}: {size / 1024 / 1024:.1f} MB")
+
+    print(f"\nCold import of {ENTRY_MODULE} (median of {args.runs} runs)")
+    print(f"{'Module':<44} {'self ms':>8} {'cumul ms':>9}")
+    print("=" * 63)
+    for name, depth, self_us, cumulative_us in sorted(modules, key=lambda m: -m[3])[:args.top]:
+        print(f"{'  ' * depth + name:<44} {self_us / 1000:>8.2f} {cumulative_us / 1000:>9.2f}")
+
+    failures = []
+    # Only what this repo's modules import; a dependency's imports aren't deferrable
+    repo_modules = {os.path.splitext(module)[0] for module in PACKAGE_MODULES}
+    eager = sorted(name for name, *_ in modules
+                   if name in DEFERRED_MODULES and parents.get(name) in repo_modules)
+    if eager:
+        failures.append(f"imported at cold start but only needed by some routes: {', '.join(eager)}")
+    if total_us / 1000 > args.budget_ms:
+        failures.append(f"cold import {total_us / 1000:.1f} ms is over the {args.budget_ms:g} ms budget")
+
+    print(f"\nTotal: {total_us / 1000:.1f} ms (budget {args.budget_ms:g} ms)")
+    if failures:
+        for failure in failures:
+            print(f"❌ {failure}")
+        sys.exit(1)
+    print("✅ Cold import within budget")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,361 @@
+"""
+asyncio execution path for the invitation handlers
+
+A drop-in Lambda entry point (handler: async_handlers.lambda_handler) for
+the same API. The invitation write routes and the email outbox drain run
+as coroutines on asyncpg and an awaitable email transport; the coroutines
+are attached to the routes on lambda_function_final's router, and every
+other route - and every route when asyncpg is not installed - is served by
+lambda_function_final.lambda_handler unchanged. asyncpg and aiohttp are in
+requirements.txt, so build_lambda.py bundles them.
+
+The concurrency is bounded twice: at most ASYNC_MAX_CONCURRENCY email API
+calls are in flight at once, and at most ASYNC_DB_POOL_SIZE database
+connections are open. The event loop and the asyncpg pool live for the
+life of the container, like the sync path's cached connection.
+"""
+import os
+import json
+import base64
+import asyncio
+import logging
+
+import lambda_function_final as api
+from email_templates import get_email_template
+from email_transport import chunk_recipients, email_transport_configured, get_async_email_transport
+from metrics import request, span
+
+# Optional async Postgres driver; without it every request takes the sync path
+try:
+    import asyncpg
+except ImportError:
+    asyncpg = None
+
+logger = logging.getLogger()
+
+# Email API calls in flight at once during a drain
+ASYNC_MAX_CONCURRENCY = int(os.environ.get('ASYNC_MAX_CONCURRENCY', 8))
+
+# Connections in the container's asyncpg pool
+ASYNC_DB_POOL_SIZE = int(os.environ.get('ASYNC_DB_POOL_SIZE', 4))
+
+_loop = None
+_db_pool = None
+
+def get_event_loop():
+    """The container's event loop, reused across warm invocations"""
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+    return _loop
+
+def run(coroutine):
+    return get_event_loop().run_until_complete(coroutine)
+
+async def get_db_pool():
+    """The container's asyncpg pool, created on first use"""
+    global _db_pool
+    if _db_pool is None:
+        with span('DbConnect'):
+            _db_pool = await asyncpg.create_pool(
+                host=api.DB_HOST,
+                database=api.DB_NAME,
+                user=api.DB_USER,
+                password=api.DB_PASSWORD,
+                port=int(api.DB_PORT),
+                min_size=1,
+                max_size=ASYNC_DB_POOL_SIZE
+            )
+    return _db_pool
+
+async def close_db_pool():
+    global _db_pool
+    if _db_pool is not None:
+        await _db_pool.close()
+        _db_pool = None
+
+async def enqueue_invitation_emails(conn, recipients):
+    """Queue invitation emails for (email, role) pairs in the caller's transaction"""
+    await conn.execute("""
+        INSERT INTO email_logs (recipient_email, email_type, subject, status)
+        SELECT email, 'invitation', subject, 'pending'
+        FROM unnest($1::text[], $2::text[]) AS r(email, subject)
+    """, [email for email, _ in recipients],
+        [get_email_template('invitation', role).subject for _, role in recipients])
+
+@api.router.coroutine('POST', '/api/send-invitation', '/api/email')
+async def handle_send_invitation(event, headers):
+    """Send a single invitation"""
+    try:
+        body = json.loads(event.get('body', '{}'))
+        contact, error = api.validate_invitation(body)
+        if error:
+            return {
+                'statusCode': 400,
+                'headers': headers,
+                'body': json.dumps({'message': error})
+            }
+        first_name, last_name = contact['firstName'], contact['lastName']
+        email, role = contact['email'], contact['role']
+
+        logger.info(f"Sending invitation to: {first_name} {last_name} ({email}) as {role}")
+
+        # The transaction rolls back on failure, taking the queued email with it
+        try:
+            pool = await get_db_pool()
+            async with pool.acquire() as conn, conn.transaction():
+                with span('DbQuery'):
+                    customer_id, invitation_code = await conn.fetchrow("""
+                        INSERT INTO invitations (first_name, last_name, email, role, status)
+                        VALUES ($1, $2, $3, $4, 'sent')
+                        RETURNING customer_id, invitation_code
+                    """, first_name, last_name, email, role)
+
+                    # Email goes out via the outbox drain once this commits
+                    await enqueue_invitation_emails(conn, [(email, role)])
+
+            api.record_write()
+            logger.info(f"Invitation saved to database: {email} with customer_id: {customer_id}")
+
+        except asyncpg.UniqueViolationError as e:
+            if 'email' in str(e):
+                return {
+                    'statusCode': 400,
+                    'headers': headers,
+                    'body': json.dumps({'message': 'Email already exists'})
+                }
+            else:
+                raise e
+        except Exception as e:
+            logger.error(f"Database insert failed: {e}")
+            return {
+                'statusCode': 503,
+                'headers': headers,
+                'body': json.dumps({'message': 'Invitation could not be saved and was not sent - please retry'})
+            }
+
+        return {
+            'statusCode': 200,
+            'headers': headers,
+            'body': json.dumps({
+                'message': 'Invitation sent successfully',
+                'customerId': customer_id,
+                'invitationCode': invitation_code
+            })
+        }
+
+    except Exception as e:
+        logger.error(f"Send invitation error: {e}")
+        return {
+            'statusCode': 500,
+            'headers': headers,
+            'body': json.dumps({'message': f'Failed to send invitation: {str(e)}'})
+        }
+
+@api.router.coroutine('POST', '/api/send-invitations')
+async def handle_send_invitations(event, headers):
+    """Send a batch of invitations in a single transaction"""
+    try:
+        contacts = api.read_bulk_invitations(event)
+    except ValueError as e:
+        return {
+            'statusCode': 400,
+            'headers': headers,
+            'body': json.dumps({'message': str(e)})
+        }
+
+    results, pending = api.validate_bulk_invitations(contacts)
+    logger.info(f"Bulk invitation request: {len(contacts)} rows, {len(pending)} valid")
+
+    sent = []
+    if pending:
+        try:
+            pool = await get_db_pool()
+            async with pool.acquire() as conn, conn.transaction():
+                with span('DbQuery'):
+                    existing = {r['email'] for r in await conn.fetch(
+                        "SELECT email FROM invitations WHERE email = ANY($1::text[])",
+                        [row['email'] for _, row in pending]
+                    )}
+
+                to_insert = []
+                for result, row in pending:
+                    if row['email'] in existing:
+                        result.update({'status': 'failed', 'message': 'Email already exists'})
+                    else:
+                        to_insert.append((result, row))
+
+                # One statement over parallel arrays; customer IDs and codes
+                # come from the column defaults
+                inserted = {}
+                if to_insert:
+                    with span('DbQuery'):
+                        returned = await conn.fetch("""
+                            INSERT INTO invitations (first_name, last_name, email, role, status)
+                            SELECT first_name, last_name, email, role, 'sent'
+                            FROM unnest($1::text[], $2::text[], $3::text[], $4::text[])
+                                AS r(first_name, last_name, email, role)
+                            ON CONFLICT DO NOTHING
+                            RETURNING email, customer_id, invitation_code
+                        """, [row['firstName'] for _, row in to_insert],
+                            [row['lastName'] for _, row in to_insert],
+                            [row['email'] for _, row in to_insert],
+                            [row['role'] for _, row in to_insert])
+                        inserted = {r['email']: tuple(r) for r in returned}
+
+                        if inserted:
+                            await enqueue_invitation_emails(conn, [(row['email'], row['role'])
+                                                                   for _, row in to_insert
+                                                                   if row['email'] in inserted])
+
+            sent = api.record_bulk_invitations(to_insert, inserted)
+
+        except Exception as e:
+            logger.error(f"Bulk invitation insert failed: {e}")
+            return {
+                'statusCode': 500,
+                'headers': headers,
+                'body': json.dumps({'message': f'Failed to send invitations: {str(e)}'})
+            }
+
+    return api.bulk_invitations_response(headers, results, sent)
+
+async def send_invitation_batch(limit, role, recipients):
+    """Send invitation emails for one role in one API call, waiting for a free slot"""
+    template = get_email_template('invitation', role)
+    async with limit:
+        with span('EmailSend'):
+            return await get_async_email_transport().send_batch(
+                api.FROM_EMAIL, template.subject, template.html.tagged_content, recipients
+            )
+
+async def drain_email_outbox(context=None):
+    """Send pending invitation emails from the outbox, every chunk of a batch at once"""
+    summary = {'sent': 0, 'retrying': 0, 'failed': 0}
+
+    if not email_transport_configured():
+        logger.warning("SendGrid API key not configured - leaving outbox pending")
+        return summary
+
+    pool = await get_db_pool()
+    limit = asyncio.Semaphore(ASYNC_MAX_CONCURRENCY)
+
+    while True:
+        async with pool.acquire() as conn, conn.transaction():
+            # Lock a batch; concurrent drains skip rows another drain holds
+            with span('DbQuery'):
+                batch = await conn.fetch("""
+                    SELECT l.id, l.recipient_email, i.first_name, i.role, i.invitation_code
+                    FROM email_logs l
+                    LEFT JOIN invitations i ON i.email = l.recipient_email
+                    WHERE l.status = 'pending' AND l.email_type = 'invitation'
+                      AND (l.next_attempt_at IS NULL OR l.next_attempt_at <= CURRENT_TIMESTAMP)
+                    ORDER BY l.created_at
+                    LIMIT $1
+                    FOR UPDATE OF l SKIP LOCKED
+                """, api.EMAIL_OUTBOX_BATCH_SIZE)
+
+            orphaned = [row[0] for row in batch if row[4] is None]
+            if orphaned:
+                await conn.execute("""
+                    UPDATE email_logs
+                    SET status = 'failed', attempts = attempts + 1,
+                        error_message = 'Invitation no longer exists'
+                    WHERE id = ANY($1::uuid[])
+                """, orphaned)
+                summary['failed'] += len(orphaned)
+
+            # The role is compiled into the body, so each API call carries one role
+            by_role = {}
+            for row in batch:
+                if row[4] is not None:
+                    by_role.setdefault(row[3], []).append(row)
+
+            chunks = [(role, rows) for role, group in by_role.items()
+                      for rows in chunk_recipients(group)]
+            outcomes = await asyncio.gather(*(
+                send_invitation_batch(limit, role, [
+                    api.invitation_email_recipient(first_name, email, role, invitation_code)
+                    for _, email, first_name, role, invitation_code in rows
+                ])
+                for role, rows in chunks
+            ), return_exceptions=True)
+
+            # The connection runs one statement at a time, so outcomes are
+            # written back once every send has finished
+            delivered = []
+            for (role, rows), outcome in zip(chunks, outcomes):
+                log_ids = [row[0] for row in rows]
+                if not isinstance(outcome, Exception):
+                    delivered.append((outcome, log_ids))
+                    summary['sent'] += len(rows)
+                    continue
+
+                logger.error(f"Outbox batch of {len(rows)} failed: {outcome}")
+                # Exponential backoff: 2, 4, 8, ... minutes, then give up
+                statuses = await conn.fetch("""
+                    UPDATE email_logs
+                    SET attempts = attempts + 1, error_message = $1,
+                        status = CASE WHEN attempts + 1 >= $2 THEN 'failed' ELSE 'pending' END,
+                        next_attempt_at = CURRENT_TIMESTAMP + make_interval(mins => POWER(2, attempts + 1)::int)
+                    WHERE id = ANY($3::uuid[])
+                    RETURNING status
+                """, str(outcome), api.EMAIL_OUTBOX_MAX_ATTEMPTS, log_ids)
+                for (status,) in statuses:
+                    summary['failed' if status == 'failed' else 'retrying'] += 1
+
+            if delivered:
+                await conn.executemany("""
+                    UPDATE email_logs
+                    SET status = 'sent', sent_at = CURRENT_TIMESTAMP, attempts = attempts + 1,
+                        provider_message_id = $1, error_message = NULL
+                    WHERE id = ANY($2::uuid[])
+                """, delivered)
+
+        # Stop on a short batch, or when the invocation is about to time out
+        if len(batch) < api.EMAIL_OUTBOX_BATCH_SIZE:
+            break
+        if context is not None and context.get_remaining_time_in_millis() < 5000:
+            break
+
+    logger.info(f"Email outbox drained: {summary}")
+    return summary
+
+async def route_request(event, headers):
+    """Dispatch an API Gateway request to its route's coroutine handler"""
+    try:
+        return await api.router.dispatch(event, headers, coroutines=True)
+
+    except Exception as e:
+        logger.error(f"Unhandled error: {e}")
+        return {
+            'statusCode': 500,
+            'headers': headers,
+            'body': json.dumps({'message': 'Internal server error'})
+        }
+
+def lambda_handler(event, context):
+    """Lambda handler running the invitation routes and outbox drain on asyncio"""
+    if asyncpg is None:
+        logger.warning("asyncpg not installed - using the sync handlers")
+        return api.lambda_handler(event, context)
+
+    path = event.get('path', '')
+    method = event.get('httpMethod', '')
+    route, _ = api.router.match(method, path)
+    if (route is None or route.coroutine is None) and event.get('action') != 'drain-email-outbox':
+        return api.lambda_handler(event, context)
+
+    api.initialize_database(force=bool(event.get('forceSchemaCheck')))
+
+    if event.get('action') == 'drain-email-outbox':
+        with request('drain-email-outbox'):
+            return run(drain_email_outbox(context))
+
+    headers = api.get_cors_headers()
+    logger.info(f"Request: {method} {path} (async)")
+
+    if event.get('isBase64Encoded') and event.get('body'):
+        event = dict(event, body=base64.b64decode(event['body']).decode('utf-8'), isBase64Encoded=False)
+
+    return api.compress_response(event, run(route_request(event, headers)))
@@ -0,0 +1,173 @@
+import time
+import threading
+
+import psycopg2
+import psycopg2.extensions
+from psycopg2.pool import PoolError, ThreadedConnectionPool
+
+class BoundedConnectionPool(ThreadedConnectionPool):
+    """ThreadedConnectionPool that waits for a free connection instead of failing
+
+    At most maxconn connections are checked out; further getconn() calls
+    queue for up to `timeout` seconds. Returned connections stay open for
+    reuse up to maxconn (psycopg2 keeps only minconn and closes the rest).
+    Connections a thread still holds can be handed back in one go with
+    release_thread_connections(), so a handler that raised before releasing
+    does not leak its connection.
+    """
+
+    def __init__(self, minconn, maxconn, timeout=30, **connect_kwargs):
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'connects': 0,
+            'checkouts': 0,
+            'waits': 0,
+            'wait_ms_total': 0.0,
+            'wait_ms_max': 0.0,
+            'timeouts': 0,
+            'in_use': 0,
+            'waiting': 0,
+            'replaced': 0
+        }
+        super().__init__(minconn, maxconn, **connect_kwargs)
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(maxconn)
+        self._held = threading.local()
+
+    def _connect(self, key=None):
+        conn = super()._connect(key)
+        with self._stats_lock:
+            self._stats['connects'] += 1
+        return conn
+
+    def _putconn(self, conn, key=None, close=False):
+        """psycopg2's _putconn, keeping up to maxconn idle connections instead of minconn"""
+        if self.closed:
+            raise PoolError("connection pool is closed")
+        if key is None:
+            key = self._rused.get(id(conn))
+            if key is None:
+                raise PoolError("trying to put unkeyed connection")
+
+        if close or conn.closed or len(self._pool) >= self.maxconn:
+            conn.close()
+        elif conn.get_transaction_status() == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+            conn.close()
+        else:
+            if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            self._pool.append(conn)
+
+        del self._used[key]
+        del self._rused[id(conn)]
+
+    def _held_connections(self):
+        if not hasattr(self._held, 'connections'):
+            self._held.connections = []
+        return self._held.connections
+
+    def getconn(self, key=None):
+        with self._stats_lock:
+            self._stats['waiting'] += 1
+        start = time.perf_counter()
+        acquired = self._slots.acquire(timeout=self.timeout)
+        waited = (time.perf_counter() - start) * 1000
+        with self._stats_lock:
+            self._stats['waiting'] -= 1
+            if not acquired:
+                self._stats['timeouts'] += 1
+            else:
+                self._stats['checkouts'] += 1
+                self._stats['in_use'] += 1
+                if waited >= 1:
+                    self._stats['waits'] += 1
+                self._stats['wait_ms_total'] += waited
+                self._stats['wait_ms_max'] = max(self._stats['wait_ms_max'], waited)
+        if not acquired:
+            raise PoolError(f"no database connection free after {self.timeout:g}s")
+
+        try:
+            conn = super().getconn(key)
+            if conn.closed or conn.get_transaction_status() == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+                # Dropped by the server while idle in the pool
+                super().putconn(conn, key, close=True)
+                conn = super().getconn(key)
+                with self._stats_lock:
+                    self._stats['replaced'] += 1
+        except Exception:
+            self._release_slot()
+            raise
+
+        self._held_connections().append(conn)
+        return conn
+
+    def putconn(self, conn, key=None, close=False):
+        with self._lock:
+            checked_out = id(conn) in self._rused
+        if not checked_out:
+            # Already returned (e.g. by release_thread_connections)
+            return
+        held = self._held_connections()
+        if conn in held:
+            held.remove(conn)
+        try:
+            super().putconn(conn, key, close=close or conn.closed)
+        finally:
+            self._release_slot()
+
+    def _release_slot(self):
+        with self._stats_lock:
+            self._stats['in_use'] -= 1
+        self._slots.release()
+
+    def release_thread_connections(self):
+        """Return every connection this thread still has checked out"""
+        for conn in list(self._held_connections()):
+            self.putconn(conn)
+
+    def stats(self):
+        """Pool size, usage and queue-wait counters"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats['size'] = self.maxconn
+        stats['open'] = len(self._pool) + len(self._used)
+        stats['wait_ms_avg'] = stats['wait_ms_total'] / stats['checkouts'] if stats['checkouts'] else 0.0
+        return stats
+
+class PerRequestConnections:
+    """The pool interface over a brand-new connection per checkout
+
+    The connect-per-request model, kept for load-test comparisons.
+    """
+
+    def __init__(self, **connect_kwargs):
+        self.connect_kwargs = connect_kwargs
+        self._held = threading.local()
+        self._lock = threading.Lock()
+        self._connects = 0
+
+    def getconn(self, key=None):
+        conn = psycopg2.connect(**self.connect_kwargs)
+        with self._lock:
+            self._connects += 1
+        if not hasattr(self._held, 'connections'):
+            self._held.connections = []
+        self._held.connections.append(conn)
+        return conn
+
+    def putconn(self, conn, key=None, close=False):
+        held = getattr(self._held, 'connections', [])
+        if conn in held:
+            held.remove(conn)
+        conn.close()
+
+    def release_thread_connections(self):
+        for conn in list(getattr(self._held, 'connections', [])):
+            self.putconn(conn)
+
+    def stats(self):
+        with self._lock:
+            return {'connects': self._connects}
+
+    def closeall(self):
+        pass
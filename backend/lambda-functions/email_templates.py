@@ -0,0 +1,139 @@
+import re
+import os
+import html
+import functools
+from urllib.parse import quote
+
+# {{ name }} or {{ name|filter }}
+FIELD_PATTERN = re.compile(r'\{\{\s*(\w+)(?:\|(\w+))?\s*\}\}')
+
+INVITATION_ACCEPT_URL = os.environ.get('INVITATION_ACCEPT_URL', 'https://peerbridge.ai/register.html')
+
+# Template sources by email type. {{ role }} and {{ roleTitle }} are baked in
+# when a template is compiled for a role; everything else is per recipient.
+TEMPLATES = {
+    'invitation': {
+        'subject': "Welcome to PeerBridge - Your {{ roleTitle }} Invitation",
+        'html': """
+        <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px;">
+            <div style="text-align: center; margin-bottom: 30px;">
+                <h1 style="color: #000; font-size: 32px; font-weight: 900; letter-spacing: 1px; margin: 0;">PEER BRIDGE</h1>
+                <p style="color: #666; font-family: 'Ink Free', cursive; font-size: 18px; margin: 5px 0;">Fund Smarter, Build Together</p>
+            </div>
+
+            <h2 style="color: #333;">Welcome to PeerBridge!</h2>
+
+            <p>Hi {{ firstName }},</p>
+
+            <p>You've been invited to join <strong>PeerBridge</strong> as a <strong>{{ role }}</strong>.</p>
+
+            <p><strong>Your Role:</strong> {{ roleTitle }}</p>
+            <p><strong>Invitation Code:</strong> {{ invitationCode }}</p>
+
+            <div style="text-align: center; margin: 30px 0;">
+                <a href="{{ acceptUrl }}?code={{ invitationCode|url }}&email={{ email|url }}"
+                   style="background-color: #4F46E5; color: white; padding: 12px 24px; text-decoration: none; border-radius: 6px; font-weight: bold;">
+                    Accept Invitation & Register
+                </a>
+            </div>
+
+            <p>If you have any questions, feel free to reach out to our team.</p>
+
+            <p>Best regards,<br>The PeerBridge Team</p>
+
+            <hr style="margin: 30px 0; border: none; border-top: 1px solid #eee;">
+            <p style="text-align: center; color: #666; font-size: 12px;">
+                PeerBridge - Fund Smarter, Build Together
+            </p>
+        </div>
+        """
+    }
+}
+
+def _escape_html(value):
+    return html.escape(str(value), quote=True)
+
+def _escape_url(value):
+    return html.escape(quote(str(value), safe=''), quote=True)
+
+def _no_escape(value):
+    return str(value)
+
+FILTERS = {
+    None: _escape_html,
+    'url': _escape_url
+}
+
+class CompiledTemplate:
+    """A template parsed once into literal chunks and per-recipient fields
+
+    Fields found in `fixed` are rendered into the literal chunks at compile
+    time, so render() only formats what changes per recipient.
+    """
+
+    def __init__(self, source, fixed=None, escape=True):
+        fixed = fixed or {}
+        self.chunks = []
+        self.fields = []
+
+        literal = []
+        position = 0
+        for match in FIELD_PATTERN.finditer(source):
+            name, filter_name = match.group(1), match.group(2)
+            if filter_name not in FILTERS:
+                raise ValueError(f"Unknown template filter: {filter_name}")
+            encode = FILTERS[filter_name] if escape else _no_escape
+
+            literal.append(source[position:match.start()])
+            position = match.end()
+            if name in fixed:
+                literal.append(encode(fixed[name]))
+            else:
+                self.chunks.append(''.join(literal))
+                self.fields.append((name, self.tag(name, filter_name), encode))
+                literal = []
+        literal.append(source[position:])
+        self.chunks.append(''.join(literal))
+
+        # The same body with every field replaced by a SendGrid substitution tag
+        tagged = [self.chunks[0]]
+        for (_, tag, _), chunk in zip(self.fields, self.chunks[1:]):
+            tagged.append(tag)
+            tagged.append(chunk)
+        self.tagged_content = ''.join(tagged)
+
+    @staticmethod
+    def tag(name, filter_name=None):
+        return f"-{name}_{filter_name}-" if filter_name else f"-{name}-"
+
+    def render(self, values):
+        """Render with the per-recipient values, escaping each one"""
+        out = [self.chunks[0]]
+        for (name, _, encode), chunk in zip(self.fields, self.chunks[1:]):
+            out.append(encode(values[name]))
+            out.append(chunk)
+        return ''.join(out)
+
+    def substitutions(self, values):
+        """Escaped per-recipient values keyed by the tags in tagged_content"""
+        return {tag: encode(values[name]) for name, tag, encode in self.fields}
+
+class EmailTemplate:
+    """Subject and HTML body of one email type, compiled for one role"""
+
+    def __init__(self, email_type, role):
+        source = TEMPLATES[email_type]
+        fixed = {
+            'role': role,
+            'roleTitle': role.title(),
+            'acceptUrl': INVITATION_ACCEPT_URL
+        }
+        self.email_type = email_type
+        self.role = role
+        self.subject = CompiledTemplate(source['subject'], fixed, escape=False).render({})
+        self.html = CompiledTemplate(source['html'], fixed)
+
+@functools.lru_cache(maxsize=None)
+def get_email_template(email_type, role):
+    """Get the compiled template for an email type and role (cached per container)"""
+    return EmailTemplate(email_type, role)
@@ -0,0 +1,324 @@
+import json
+import os
+import time
+import queue
+import logging
+import threading
+import importlib.util
+import http.client
+
+logger = logging.getLogger()
+
+# SendGrid v3 allows up to 1000 personalizations (recipients) per request
+MAX_RECIPIENTS_PER_REQUEST = 1000
+
+# Recipients per API call; smaller batches spread a large send over
+# several calls, which the async path can have in flight at once
+EMAIL_BATCH_SIZE = min(int(os.environ.get('EMAIL_BATCH_SIZE', MAX_RECIPIENTS_PER_REQUEST)),
+                       MAX_RECIPIENTS_PER_REQUEST)
+
+class EmailSendError(Exception):
+    """A batch was rejected by the email provider"""
+
+    def __init__(self, message, status_code=None, retry_after=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+class EmailRateLimited(EmailSendError):
+    """The provider asked us to slow down (HTTP 429)"""
+
+def build_personalizations(recipients):
+    """Turn recipient dicts into SendGrid v3 personalizations
+
+    Each recipient is {'email': ..., 'subject': ..., 'substitutions': {...}};
+    substitution keys are the tags used in the shared content.
+    """
+    personalizations = []
+    for recipient in recipients:
+        personalization = {'to': [{'email': recipient['email']}]}
+        if recipient.get('subject'):
+            personalization['subject'] = recipient['subject']
+        if recipient.get('substitutions'):
+            personalization['substitutions'] = recipient['substitutions']
+        personalizations.append(personalization)
+    return personalizations
+
+def build_mail_payload(from_email, subject, html_content, recipients):
+    """The SendGrid v3 mail/send body for one batch"""
+    return {
+        'personalizations': build_personalizations(recipients),
+        'from': {'email': from_email},
+        'subject': subject,
+        'content': [{'type': 'text/html', 'value': html_content}]
+    }
+
+def check_sendgrid_response(status, body, rate_limit_reset=None):
+    """Raise EmailSendError (EmailRateLimited for 429) for a failed mail/send"""
+    if status == 429:
+        retry_after = max(0.0, float(rate_limit_reset) - time.time()) if rate_limit_reset else None
+        raise EmailRateLimited('SendGrid rate limit exceeded', 429, retry_after)
+    if status >= 300:
+        raise EmailSendError(f'SendGrid returned {status}: {body[:500]!r}', status)
+
+def chunk_recipients(recipients, size=EMAIL_BATCH_SIZE):
+    """Split recipients into provider-sized batches"""
+    for start in range(0, len(recipients), size):
+        yield recipients[start:start + size]
+
+class SendGridTransport:
+    """SendGrid v3 mail/send over a pool of keep-alive HTTPS connections"""
+
+    host = 'api.sendgrid.com'
+
+    def __init__(self, api_key, pool_size=4, timeout=10):
+        self.api_key = api_key
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=pool_size)
+        self.stats = {'requests': 0, 'connections_opened': 0, 'connections_reused': 0}
+
+    def _acquire(self):
+        try:
+            conn = self._idle.get_nowait()
+            self.stats['connections_reused'] += 1
+            return conn
+        except queue.Empty:
+            self.stats['connections_opened'] += 1
+            return http.client.HTTPSConnection(self.host, timeout=self.timeout)
+
+    def _release(self, conn):
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def _post(self, payload):
+        """POST /v3/mail/send, retrying once if a pooled connection went stale"""
+        body = json.dumps(payload)
+        headers = {
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json'
+        }
+        for attempt in range(2):
+            conn = self._acquire()
+            try:
+                conn.request('POST', '/v3/mail/send', body=body, headers=headers)
+                response = conn.getresponse()
+                response_body = response.read()
+                self._release(conn)
+                return response, response_body
+            except (http.client.RemoteDisconnected, ConnectionError, http.client.CannotSendRequest):
+                conn.close()
+                if attempt:
+                    raise
+            except Exception:
+                conn.close()
+                raise
+
+    def send_batch(self, from_email, subject, html_content, recipients):
+        """Send one request carrying every recipient; returns the provider message ID"""
+        payload = build_mail_payload(from_email, subject, html_content, recipients)
+
+        self.stats['requests'] += 1
+        response, response_body = self._post(payload)
+
+        check_sendgrid_response(response.status, response_body, response.getheader('X-RateLimit-Reset'))
+        return response.getheader('X-Message-Id')
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+class FakeTransport:
+    """In-process stand-in for SendGrid that simulates latency and rate limits
+
+    latency is seconds per API call; rate_limit is API calls allowed per
+    second (0 for unlimited). Sent messages are kept in self.sent.
+    """
+
+    def __init__(self, latency=0.05, rate_limit=0, per_recipient_latency=0.0):
+        self.latency = latency
+        self.per_recipient_latency = per_recipient_latency
+        self.rate_limit = rate_limit
+        self.sent = []
+        self.stats = {'requests': 0, 'rate_limited': 0}
+        self._lock = threading.Lock()
+        self._tokens = float(rate_limit)
+        self._refilled = time.monotonic()
+
+    def _take_token(self):
+        if not self.rate_limit:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(float(self.rate_limit),
+                               self._tokens + (now - self._refilled) * self.rate_limit)
+            self._refilled = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def _admit(self, recipients):
+        """Apply the provider's size and rate limits; returns the simulated call time"""
+        if len(recipients) > MAX_RECIPIENTS_PER_REQUEST:
+            raise EmailSendError(f'Too many personalizations: {len(recipients)}', 400)
+        if not self._take_token():
+            with self._lock:
+                self.stats['rate_limited'] += 1
+            raise EmailRateLimited('Fake rate limit exceeded', 429, 1.0 / self.rate_limit)
+        return self.latency + self.per_recipient_latency * len(recipients)
+
+    def send_batch(self, from_email, subject, html_content, recipients):
+        time.sleep(self._admit(recipients))
+        return self._record(from_email, subject, html_content, recipients)
+
+    def _record(self, from_email, subject, html_content, recipients):
+        message_id = f'fake-{id(recipients):x}-{time.monotonic_ns():x}'
+        with self._lock:
+            self.stats['requests'] += 1
+            self.sent.append({
+                'from': from_email,
+                'subject': subject,
+                'content': html_content,
+                'personalizations': build_personalizations(recipients),
+                'message_id': message_id
+            })
+        return message_id
+
+    def close(self):
+        pass
+
+class AsyncSendGridTransport:
+    """SendGrid v3 mail/send from asyncio over an aiohttp keep-alive session
+
+    At most pool_size requests are in flight; further send_batch() calls
+    wait for a connection.
+    """
+
+    url = f'https://{SendGridTransport.host}/v3/mail/send'
+
+    def __init__(self, api_key, pool_size=8, timeout=10):
+        self.api_key = api_key
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._session = None
+        self.stats = {'requests': 0}
+
+    def _get_session(self):
+        # Created on first use so it binds to the running event loop
+        if self._session is None or self._session.closed:
+            import aiohttp
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers={'Authorization': f'Bearer {self.api_key}'}
+            )
+        return self._session
+
+    async def send_batch(self, from_email, subject, html_content, recipients):
+        """Send one request carrying every recipient; returns the provider message ID"""
+        payload = build_mail_payload(from_email, subject, html_content, recipients)
+
+        self.stats['requests'] += 1
+        async with self._get_session().post(self.url, json=payload) as response:
+            body = await response.read()
+            check_sendgrid_response(response.status, body, response.headers.get('X-RateLimit-Reset'))
+            return response.headers.get('X-Message-Id')
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+class ThreadedAsyncTransport:
+    """Awaitable wrapper running a blocking transport's calls on the default executor"""
+
+    def __init__(self, transport):
+        self.transport = transport
+
+    @property
+    def stats(self):
+        return self.transport.stats
+
+    async def send_batch(self, from_email, subject, html_content, recipients):
+        import asyncio
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.transport.send_batch,
+                                          from_email, subject, html_content, recipients)
+
+    async def close(self):
+        self.transport.close()
+
+class AsyncFakeTransport(FakeTransport):
+    """FakeTransport whose simulated API latency is an asyncio.sleep"""
+
+    async def send_batch(self, from_email, subject, html_content, recipients):
+        import asyncio
+        await asyncio.sleep(self._admit(recipients))
+        return self._record(from_email, subject, html_content, recipients)
+
+    async def close(self):
+        pass
+
+# Long-lived transport shared by every invocation in this container
+_transport = None
+_async_transport = None
+
+def email_transport_configured():
+    """True when there is somewhere to send email"""
+    if _transport is not None or _async_transport is not None or os.environ.get('EMAIL_TRANSPORT', '').lower() == 'fake':
+        return True
+    return bool(os.environ.get('SENDGRID_API_KEY'))
+
+def get_email_transport():
+    """Get the container's email transport, selected by EMAIL_TRANSPORT"""
+    global _transport
+    if _transport is None:
+        kind = os.environ.get('EMAIL_TRANSPORT', 'sendgrid').lower()
+        if kind == 'fake':
+            _transport = FakeTransport(
+                latency=float(os.environ.get('FAKE_EMAIL_LATENCY', 0.05)),
+                rate_limit=float(os.environ.get('FAKE_EMAIL_RATE_LIMIT', 0))
+            )
+        else:
+            _transport = SendGridTransport(
+                os.environ.get('SENDGRID_API_KEY'),
+                pool_size=int(os.environ.get('EMAIL_POOL_SIZE', 4))
+            )
+        logger.info(f"Email transport: {type(_transport).__name__}")
+    return _transport
+
+def set_email_transport(transport):
+    """Replace the container's email transport (benchmarks and local runs)"""
+    global _transport
+    _transport = transport
+
+def get_async_email_transport():
+    """Get the container's awaitable email transport, selected by EMAIL_TRANSPORT"""
+    global _async_transport
+    if _async_transport is None:
+        kind = os.environ.get('EMAIL_TRANSPORT', 'sendgrid').lower()
+        if kind == 'fake':
+            _async_transport = AsyncFakeTransport(
+                latency=float(os.environ.get('FAKE_EMAIL_LATENCY', 0.05)),
+                rate_limit=float(os.environ.get('FAKE_EMAIL_RATE_LIMIT', 0))
+            )
+        # aiohttp is optional; without it the blocking transport runs on threads
+        elif importlib.util.find_spec('aiohttp') is not None:
+            _async_transport = AsyncSendGridTransport(
+                os.environ.get('SENDGRID_API_KEY'),
+                pool_size=int(os.environ.get('EMAIL_POOL_SIZE', 4))
+            )
+        else:
+            _async_transport = ThreadedAsyncTransport(get_email_transport())
+        logger.info(f"Async email transport: {type(_async_transport).__name__}")
+    return _async_transport
+
+def set_async_email_transport(transport):
+    """Replace the container's awaitable email transport (benchmarks and local runs)"""
+    global _async_transport
+    _async_transport = transport
@@ -1,10 +1,50 @@
 import json
+import base64
+import hashlib
 import psycopg2
 import os
 import logging
-import random
-import string
-from datetime import datetime
+import threading
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from metrics import instrumented, request, span
+from prepared_statements import PreparingConnection, execute_prepared
+from routes import Router, timed
+
+# Cold start: every route but OPTIONS needs psycopg2, so it loads up front.
+# Modules only some routes use - email templates and transport, csv,
+# psycopg2.extras, gzip/brotli - are imported inside the functions that
+# need them. backend/build_lambda.py fails the build if they creep back in.
+
+# Optional brotli support for response compression (gzip otherwise),
+# imported by the first response that asks for it
+_brotli = None
+
+def load_brotli():
+    """The brotli module, or None when it is not installed"""
+    global _brotli
+    if _brotli is None:
+        try:
+            import brotli
+            _brotli = brotli
+        except ImportError:
+            _brotli = False
+    return _brotli or None
+
+# Optional faster JSON encoder for large response bodies
+try:
+    import orjson
+    
+    def _json_dumps(obj):
+        return orjson.dumps(obj).decode()
+except ImportError:
+    _json_dumps = json.dumps
+
+def fast_json_dumps(obj):
+    """Serialize a response body (timed as the Serialize phase)"""
+    with span('Serialize'):
+        return _json_dumps(obj)
 
 # Configure logging
 logger = logging.getLogger()
@@ -17,36 +57,290 @@ DB_USER = os.environ.get('DB_USER')
 DB_PASSWORD = os.environ.get('DB_PASSWORD')
 DB_PORT = os.environ.get('DB_PORT', 5432)
 
-# SendGrid configuration
-SENDGRID_API_KEY = os.environ.get('SENDGRID_API_KEY')
+# Seconds a cached connection may sit idle before it is pinged on checkout
+DB_PING_INTERVAL = float(os.environ.get('DB_PING_INTERVAL', 30))
+
+# Optional read replica for GET routes: DATABASE_READ_URL, or DB_READ_HOST
+# with the primary's database name and credentials
+DATABASE_READ_URL = os.environ.get('DATABASE_READ_URL')
+DB_READ_HOST = os.environ.get('DB_READ_HOST')
+DB_READ_PORT = os.environ.get('DB_READ_PORT', DB_PORT)
+DB_READ_CONNECT_TIMEOUT = int(os.environ.get('DB_READ_CONNECT_TIMEOUT', 3))
+
+# Seconds a container keeps reading from the primary after its own write
+DB_READ_AFTER_WRITE_WINDOW = float(os.environ.get('DB_READ_AFTER_WRITE_WINDOW', 5))
+
+# Seconds to read from the primary after the replica could not be reached
+DB_READ_RETRY_INTERVAL = float(os.environ.get('DB_READ_RETRY_INTERVAL', 30))
+
+# Email configuration (transport selected in email_transport.py)
+FROM_EMAIL = os.environ.get('FROM_EMAIL', 'noreply@peerbridge.ai')
+
+# Every API endpoint is registered on this router with @router.route
+router = Router(middleware=[timed, instrumented])
+
+class TimedCursor(psycopg2.extensions.cursor):
+    """Cursor recording each statement as DbQuery and row materialization as DbFetch"""
+    
+    def execute(self, query, vars=None):
+        with span('DbQuery'):
+            return super().execute(query, vars)
+    
+    def executemany(self, query, vars_list):
+        with span('DbQuery'):
+            return super().executemany(query, vars_list)
+    
+    def fetchone(self):
+        with span('DbFetch'):
+            return super().fetchone()
+    
+    def fetchmany(self, size=None):
+        with span('DbFetch'):
+            return super().fetchmany(size) if size is not None else super().fetchmany()
+    
+    def fetchall(self):
+        with span('DbFetch'):
+            return super().fetchall()
 
 def get_cors_headers():
     """Get CORS headers for responses"""
     return {
         'Access-Control-Allow-Origin': '*',
-        'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token',
+        'Access-Control-Allow-Headers': 'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token,If-None-Match',
+        'Access-Control-Expose-Headers': 'ETag',
         'Access-Control-Allow-Methods': 'GET,POST,PUT,DELETE,OPTIONS'
     }
 
+# Shared connection pools in server mode (see server.py); None on Lambda,
+# where each container keeps the cached connections below
+_db_pool = None
+_db_read_pool = None
+
+def set_db_pool(pool, read_pool=None):
+    """Serve get/release_db_connection from pools with getconn/putconn"""
+    global _db_pool, _db_read_pool
+    _db_pool = pool
+    _db_read_pool = read_pool
+
+def db_connect_kwargs():
+    """psycopg2.connect() arguments for the configured database"""
+    return {
+        'host': DB_HOST,
+        'database': DB_NAME,
+        'user': DB_USER,
+        'password': DB_PASSWORD,
+        'port': DB_PORT,
+        'connection_factory': PreparingConnection,
+        'cursor_factory': TimedCursor
+    }
+
+def read_replica_configured():
+    """True when DATABASE_READ_URL or DB_READ_HOST names a read replica"""
+    return bool(DATABASE_READ_URL or DB_READ_HOST)
+
+def db_read_connect_kwargs():
+    """psycopg2.connect() arguments for the read replica"""
+    if DATABASE_READ_URL:
+        kwargs = {
+            'dsn': DATABASE_READ_URL,
+            'connection_factory': PreparingConnection,
+            'cursor_factory': TimedCursor
+        }
+    else:
+        kwargs = dict(db_connect_kwargs(), host=DB_READ_HOST, port=DB_READ_PORT)
+    # Fail fast so an unreachable replica falls back instead of hanging the request
+    kwargs['connect_timeout'] = DB_READ_CONNECT_TIMEOUT
+    return kwargs
+
+# Connection cache - module level so it survives warm Lambda invocations.
+# 'primary' takes every query unless a replica_reads route picks 'replica'
+_db_connections = {'primary': None, 'replica': None}
+_db_connections_last_used = {'primary': 0.0, 'replica': 0.0}
+_db_connection_stats = {'hits': 0, 'misses': 0, 'reconnects': 0,
+                        'replica_hits': 0, 'replica_misses': 0, 'replica_reconnects': 0,
+                        'replica_fallbacks': 0}
+
+def _is_connection_usable(conn, last_used):
+    """Check a cached connection is still alive, recovering failed transactions"""
+    if conn.closed:
+        return False
+    
+    status = conn.get_transaction_status()
+    if status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+        return False
+    if status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+        # Left over from a handler that failed mid-transaction
+        try:
+            conn.rollback()
+        except psycopg2.Error:
+            return False
+    
+    if time.monotonic() - last_used > DB_PING_INTERVAL:
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+            conn.rollback()
+        except psycopg2.Error:
+            return False
+    
+    return True
+
+def close_db_connection(target=None):
+    """Close and forget the cached connection to one database, or to both"""
+    for name in ([target] if target else list(_db_connections)):
+        conn = _db_connections[name]
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+            _db_connections[name] = None
+
+# Read routing: replica_reads sets this for the request's thread
+_db_target = threading.local()
+
+# When this container last committed a write, and until when the replica is
+# skipped after it failed
+_last_write = float('-inf')
+_db_read_unavailable_until = 0.0
+
 def get_db_connection():
-    """Get database connection"""
-    return psycopg2.connect(
-        host=DB_HOST,
-        database=DB_NAME,
-        user=DB_USER,
-        password=DB_PASSWORD,
-        port=DB_PORT
-    )
+    """Get database connection, reusing the cached one across warm invocations
+
+    Inside a replica_reads route the connection is to the read replica, when
+    one is configured and reachable.
+    """
+    with span('DbConnect'):
+        if _use_read_replica():
+            conn = _get_db_read_connection()
+            if conn is not None:
+                return conn
+        if _db_pool is not None:
+            return _db_pool.getconn()
+        return _get_db_connection('primary')
+
+def _use_read_replica():
+    if not getattr(_db_target, 'replica', False) or not read_replica_configured():
+        return False
+    if _db_pool is not None and _db_read_pool is None:
+        return False
+    now = time.monotonic()
+    return now >= _db_read_unavailable_until and now - _last_write >= DB_READ_AFTER_WRITE_WINDOW
+
+def _get_db_read_connection():
+    """A replica connection, or None (and the replica is skipped for a while) if it fails"""
+    global _db_read_unavailable_until
+    try:
+        conn = _db_read_pool.getconn() if _db_read_pool is not None else _get_db_connection('replica')
+    except psycopg2.Error as e:
+        logger.warning(f"Read replica unavailable - using the primary for {DB_READ_RETRY_INTERVAL:g}s: {e}")
+        _db_connection_stats['replica_fallbacks'] += 1
+        _db_read_unavailable_until = time.monotonic() + DB_READ_RETRY_INTERVAL
+        return None
+    conn.replica = True
+    return conn
+
+def _get_db_connection(target):
+    prefix = 'replica_' if target == 'replica' else ''
+    conn = _db_connections[target]
+    
+    if conn is not None:
+        if _is_connection_usable(conn, _db_connections_last_used[target]):
+            _db_connection_stats[prefix + 'hits'] += 1
+            _db_connections_last_used[target] = time.monotonic()
+            return conn
+        logger.warning(f"Cached {target} database connection is no longer usable - reconnecting")
+        _db_connection_stats[prefix + 'reconnects'] += 1
+        close_db_connection(target)
+    
+    _db_connection_stats[prefix + 'misses'] += 1
+    connect_kwargs = db_read_connect_kwargs() if target == 'replica' else db_connect_kwargs()
+    conn = _db_connections[target] = psycopg2.connect(**connect_kwargs)
+    _db_connections_last_used[target] = time.monotonic()
+    return conn
+
+def release_db_connection(conn):
+    """Return a connection to the cache, ending any open transaction"""
+    if _db_pool is not None:
+        (_db_read_pool if getattr(conn, 'replica', False) else _db_pool).putconn(conn)
+        return
+    if conn.closed:
+        return
+    if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+        conn.rollback()
 
-def initialize_database():
-    """Initialize database - just log that it's ready"""
+def abandon_db_connection(conn):
+    """Release a connection after a failed query, rolling back its transaction"""
+    if conn is None:
+        return
+    try:
+        release_db_connection(conn)
+    except psycopg2.Error as e:
+        # The next checkout finds a broken connection unusable and reconnects
+        logger.warning(f"Rollback after a failed query failed: {e}")
+
+def get_db_connection_stats():
+    """Get connection cache hit/miss counters for this container (plus pool stats in server mode)"""
+    stats = dict(_db_connection_stats)
+    if _db_connections['primary'] is not None:
+        stats['prepared'] = len(getattr(_db_connections['primary'], 'prepared_statements', ()))
+    if _db_pool is not None:
+        stats['pool'] = _db_pool.stats()
+    if _db_read_pool is not None:
+        stats['read_pool'] = _db_read_pool.stats()
+    return stats
+
+def record_write():
+    """Note a committed write: drop cached stats and keep this container's reads on the primary"""
+    global _last_write
+    _last_write = time.monotonic()
+    invalidate_dashboard_stats()
+
+def consistent_read_requested(event):
+    """True when the client asked to read its own writes (?consistent=1)
+
+    A query parameter rather than a header, so the browser's GET stays a
+    simple request with no CORS preflight.
+    """
+    params = event.get('queryStringParameters') or {}
+    return (params.get('consistent') or '').strip().lower() in ('1', 'true', 'yes')
+
+def replica_reads(handler):
+    """Route middleware sending a read-only handler's queries to the read replica
+
+    Without a replica configured, for a request with ?consistent=1, and
+    for DB_READ_AFTER_WRITE_WINDOW seconds after this container writes, the
+    handler reads from the primary as usual.
+    """
+    def wrapper(event, headers):
+        if not read_replica_configured() or consistent_read_requested(event):
+            return handler(event, headers)
+        _db_target.replica = True
+        try:
+            return handler(event, headers)
+        finally:
+            _db_target.replica = False
+    wrapper.__name__ = handler.__name__
+    return wrapper
+
+# Schema check result - memoized so it runs once per container
+_schema_verified = None
+
+def initialize_database(force=False):
+    """Verify the database schema once per container (force=True re-checks)"""
+    global _schema_verified
+    
+    if _schema_verified is not None and not force:
+        return _schema_verified
+    
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
         
         # Check if table exists and has customer_id column
         cursor.execute("""
-            SELECT column_name 
+            SELECT column_name, column_default 
             FROM information_schema.columns 
             WHERE table_name = 'invitations' AND column_name = 'customer_id'
         """)
@@ -55,38 +349,141 @@ def initialize_database():
         
         if customer_id_exists:
             logger.info("Database initialized successfully - customer_id column exists")
+            if 'next_customer_id' not in (customer_id_exists[1] or ''):
+                logger.warning("customer_id has no sequence default - run database/migrations/001_customer_id_sequence.sql")
         else:
             logger.warning("customer_id column missing - database may need updating")
         
+        # Dashboard stats read invitation_stats, which sums these counters
+        cursor.execute("SELECT to_regclass('invitation_counters')")
+        if cursor.fetchone()[0] is None:
+            logger.warning("invitation_counters missing - run database/migrations/006_invitation_counters.sql")
+        else:
+            # GET /api/invitations ETags are versioned by invitation_counters.changes
+            cursor.execute("""
+                SELECT 1 FROM information_schema.columns
+                WHERE table_name = 'invitation_counters' AND column_name = 'changes'
+            """)
+            if cursor.fetchone() is None:
+                logger.warning("invitation_counters.changes missing - run database/migrations/009_invitation_counters_changes.sql")
+        
         cursor.close()
-        conn.close()
+        release_db_connection(conn)
+        
+        _schema_verified = bool(customer_id_exists)
         
     except Exception as e:
+        # Not memoized - the next request retries the check
         logger.error(f"Database check failed: {e}")
+        return False
+    
+    return _schema_verified
+
+def get_request_header(event, name):
+    """Case-insensitive request header lookup"""
+    name = name.lower()
+    for key, value in (event.get('headers') or {}).items():
+        if key.lower() == name:
+            return value
+    return None
+
+def get_invitations_version(cursor):
+    """Version token for the invitations table that costs the same at any table size
+
+    The trigger-maintained counters' changes total grows with every row
+    written, in the writing transaction, so any committed write changes it.
+    updated_at is a transaction's start time and can't be relied on alone: a
+    write committing after a newer one leaves MAX(updated_at) where it was.
+    The newest updated_at and tombstone and the counter total are kept as
+    cross-checks.
+    """
+    execute_prepared(cursor, """
+        SELECT (SELECT MAX(updated_at) FROM invitations),
+               (SELECT MAX(deleted_at) FROM invitation_deletions),
+               (SELECT COALESCE(SUM(count), 0) FROM invitation_counters),
+               (SELECT COALESCE(SUM(changes), 0) FROM invitation_counters)
+    """)
+    last_updated, last_deleted, total, changes = cursor.fetchone()
+    return ':'.join(value.isoformat() if value else '' for value in (last_updated, last_deleted)) + f":{total}:{changes}"
+
+def make_etag(*parts):
+    """Weak ETag over a resource name, data version and request parameters"""
+    digest = hashlib.sha1('|'.join(str(part) for part in parts).encode()).hexdigest()
+    return f'W/"{digest}"'
+
+def etag_matches(event, etag):
+    """True when If-None-Match already names this ETag"""
+    if_none_match = get_request_header(event, 'If-None-Match')
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    opaque = etag[2:] if etag.startswith('W/') else etag
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+def with_etag(headers, etag):
+    """Response headers carrying the ETag; clients must revalidate before reuse"""
+    headers = dict(headers)
+    headers['ETag'] = etag
+    headers['Cache-Control'] = 'no-cache'
+    return headers
+
+def not_modified_response(headers, etag):
+    """304 with no body"""
+    return {
+        'statusCode': 304,
+        'headers': with_etag(headers, etag),
+        'body': ''
+    }
 
-def handle_get_dashboard_stats(headers):
+# Dashboard stats cache - seconds to reuse a result within this container (0 disables)
+DASHBOARD_STATS_TTL = float(os.environ.get('DASHBOARD_STATS_TTL', 10))
+_dashboard_stats_cache = {'stats': None, 'etag': None, 'expires': 0.0}
+
+def invalidate_dashboard_stats():
+    """Drop cached dashboard stats after a write in this container"""
+    _dashboard_stats_cache['stats'] = None
+    _dashboard_stats_cache['etag'] = None
+    _dashboard_stats_cache['expires'] = 0.0
+
+@router.route('GET', '/api/dashboard-stats', middleware=[replica_reads])
+def handle_get_dashboard_stats(event, headers):
     """Get dashboard statistics from database"""
     try:
+        now = time.monotonic()
+        stats = _dashboard_stats_cache['stats']
+        if stats is not None and now < _dashboard_stats_cache['expires']:
+            etag = _dashboard_stats_cache['etag']
+            if etag_matches(event, etag):
+                return not_modified_response(headers, etag)
+            return {
+                'statusCode': 200,
+                'headers': with_etag(headers, etag),
+                'body': json.dumps(stats)
+            }
+        
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        # Get total invitations sent
-        cursor.execute("SELECT COUNT(*) FROM invitations")
-        total_invitations = cursor.fetchone()[0]
-        
-        # Get users registered (accepted invitations)
-        cursor.execute("SELECT COUNT(*) FROM invitations WHERE status = 'accepted'")
-        users_registered = cursor.fetchone()[0]
-        
-        # Get pending invitations
-        cursor.execute("SELECT COUNT(*) FROM invitations WHERE status IN ('sent', 'pending')")
-        pending_invitations = cursor.fetchone()[0]
+        # invitation_stats sums the trigger-maintained invitation_counters
+        # rows, so this costs the same at any table size
+        execute_prepared(cursor, """
+            SELECT total_invitations, accepted_invitations, pending_invitations
+            FROM invitation_stats
+        """)
+        total_invitations, users_registered, pending_invitations = cursor.fetchone()
         
         # Get invitation errors (you can define your own criteria)
         invitation_errors = 0
         
         cursor.close()
-        conn.close()
+        release_db_connection(conn)
         
         stats = {
             'totalInvitationsSent': total_invitations,
@@ -95,11 +492,23 @@ def handle_get_dashboard_stats(headers):
             'invitationErrors': invitation_errors
         }
         
+        # The counts are the version - reading them is cheaper than any table check
+        etag = make_etag('dashboard-stats', total_invitations, users_registered,
+                         pending_invitations, invitation_errors)
+        
+        if DASHBOARD_STATS_TTL > 0:
+            _dashboard_stats_cache['stats'] = stats
+            _dashboard_stats_cache['etag'] = etag
+            _dashboard_stats_cache['expires'] = now + DASHBOARD_STATS_TTL
+        
         logger.info(f"Dashboard stats: {stats}")
         
+        if etag_matches(event, etag):
+            return not_modified_response(headers, etag)
+        
         return {
             'statusCode': 200,
-            'headers': headers,
+            'headers': with_etag(headers, etag),
             'body': json.dumps(stats)
         }
         
@@ -117,46 +526,401 @@ def handle_get_dashboard_stats(headers):
             })
         }
 
-def handle_get_invitations(headers):
-    """Get all invitations from database"""
+# Page size bounds for GET /api/invitations
+INVITATIONS_DEFAULT_LIMIT = int(os.environ.get('INVITATIONS_DEFAULT_LIMIT', 100))
+INVITATIONS_MAX_LIMIT = int(os.environ.get('INVITATIONS_MAX_LIMIT', 500))
+
+def encode_invitations_cursor(invited_on, invitation_id):
+    """Encode the (invited_on, id) keyset position as an opaque cursor"""
+    position = json.dumps([invited_on.isoformat(), invitation_id])
+    return base64.urlsafe_b64encode(position.encode()).decode().rstrip('=')
+
+def decode_invitations_cursor(cursor):
+    """Decode an opaque cursor back into (invited_on, id); raises ValueError if malformed"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        invited_on, invitation_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(invited_on), int(invitation_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def parse_invitations_page(params):
+    """Read limit and cursor query parameters; raises ValueError if invalid"""
+    limit = params.get('limit')
+    if limit is None:
+        limit = INVITATIONS_DEFAULT_LIMIT
+    else:
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ValueError(f"Invalid limit: {limit}")
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        limit = min(limit, INVITATIONS_MAX_LIMIT)
+    
+    cursor = params.get('cursor')
+    position = decode_invitations_cursor(cursor) if cursor else None
+    
+    return limit, position
+
+# How GET /api/invitations builds its body: 'database' has Postgres assemble
+# the JSON, 'python' materializes rows and serializes them here
+INVITATIONS_JSON_MODE = os.environ.get('INVITATIONS_JSON_MODE', 'database')
+
+INVITATION_STATUSES = ('pending', 'sent', 'accepted', 'expired', 'rejected')
+
+# Query parameters that narrow GET /api/invitations
+INVITATIONS_FILTER_PARAMS = ('status', 'role', 'invitedFrom', 'invitedTo', 'q')
+
+# Must match the expression of idx_invitations_search_trgm for the
+# trigram index to serve name/email searches
+INVITATION_SEARCH_EXPRESSION = "lower(first_name || ' ' || last_name || ' ' || email)"
+
+def parse_invitations_filters(params):
+    """Read status, role, invitedFrom/invitedTo and q query parameters; raises ValueError if invalid"""
+    filters = {}
+    
+    # status and role take one value or a comma-separated list
+    for name, allowed in (('status', INVITATION_STATUSES), ('role', VALID_ROLES)):
+        value = params.get(name)
+        if value:
+            values = [item.strip().lower() for item in value.split(',') if item.strip()]
+            unknown = [item for item in values if item not in allowed]
+            if unknown:
+                raise ValueError(f"Invalid {name}: {', '.join(unknown)}")
+            filters[name] = values
+    
+    # invitedFrom is inclusive, invitedTo exclusive - except that a bare
+    # date in invitedTo includes that whole day. Bounds without an offset
+    # (bare dates included) are UTC, and every bound is compared in UTC
+    for name in ('invitedFrom', 'invitedTo'):
+        value = params.get(name)
+        if value:
+            value = value.strip()
+            try:
+                moment = datetime.fromisoformat(value.replace('Z', '+00:00'))
+            except ValueError:
+                raise ValueError(f"Invalid {name}: {value} (expected an ISO 8601 date)")
+            if moment.tzinfo is None:
+                moment = moment.replace(tzinfo=timezone.utc)
+            else:
+                moment = moment.astimezone(timezone.utc)
+            if name == 'invitedTo' and is_bare_date(value):
+                moment += timedelta(days=1)
+            filters[name] = moment
+    
+    # Case-insensitive substring match on first name, last name and email
+    search = (params.get('q') or '').strip()
+    if search:
+        filters['q'] = search.lower()
+    
+    return filters
+
+def is_bare_date(value):
+    """True for an ISO 8601 date without a time part (2025-10-11)"""
+    try:
+        date.fromisoformat(value)
+    except ValueError:
+        return False
+    return True
+
+def escape_like(value):
+    """Escape LIKE wildcards so user input matches literally"""
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+def invitations_where(filters, position):
+    """WHERE clause and parameters for the list filters and (invited_on, id) keyset position"""
+    clauses = []
+    params = []
+    if 'status' in filters:
+        clauses.append("status = ANY(%s)")
+        params.append(filters['status'])
+    if 'role' in filters:
+        clauses.append("role = ANY(%s)")
+        params.append(filters['role'])
+    if 'invitedFrom' in filters:
+        clauses.append("invited_on >= %s")
+        params.append(filters['invitedFrom'])
+    if 'invitedTo' in filters:
+        clauses.append("invited_on < %s")
+        params.append(filters['invitedTo'])
+    if 'q' in filters:
+        clauses.append(f"{INVITATION_SEARCH_EXPRESSION} LIKE %s")
+        params.append('%' + escape_like(filters['q']) + '%')
+    if position:
+        clauses.append("(invited_on, id) < (%s, %s)")
+        params.extend(position)
+    
+    if not clauses:
+        return "", []
+    return "WHERE " + " AND ".join(clauses), params
+
+INVITATION_COLUMNS = """id, customer_id, first_name, last_name, email, role, status, 
+               invitation_code, invited_on, accepted_on"""
+
+def format_timestamp(value):
+    """UTC ISO 8601 with microseconds - the database JSON mode's to_char format"""
+    return value.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ') if value else None
+
+def serialize_invitation(row):
+    """API representation of an invitations row selected with INVITATION_COLUMNS"""
+    return {
+        'customerId': row[1],  # Use actual customer_id from database
+        'firstName': row[2],
+        'lastName': row[3],
+        'email': row[4],
+        'role': row[5],
+        'status': row[6],
+        'invitationCode': row[7],
+        'invitedOn': format_timestamp(row[8]),
+        'acceptedOn': format_timestamp(row[9])
+    }
+
+def build_invitations_page_in_python(cursor, limit, position, filters=None, sync_token=None):
+    """Fetch a page as rows and serialize it in Python; returns (body, count)"""
+    keyset, params = invitations_where(filters or {}, position)
+    
+    # Keyset pagination on (invited_on, id) - one extra row tells us
+    # whether another page exists
+    execute_prepared(cursor, f"""
+        SELECT {INVITATION_COLUMNS}
+        FROM invitations 
+        {keyset}
+        ORDER BY invited_on DESC, id DESC
+        LIMIT %s
+    """, params + [limit + 1])
+    
+    rows = cursor.fetchall()
+    
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_invitations_cursor(last[8], last[0])
+    
+    invitations = [serialize_invitation(row) for row in rows]
+    
+    page = {
+        'invitations': invitations,
+        'nextCursor': next_cursor
+    }
+    if sync_token:
+        page['syncToken'] = sync_token
+    body = fast_json_dumps(page)
+    return body, len(invitations)
+
+def build_invitations_page_in_database(cursor, limit, position, filters=None, sync_token=None):
+    """Have Postgres assemble the page as JSON text; returns (body, count)"""
+    keyset, params = invitations_where(filters or {}, position)
+    
+    # The ::text cast stops psycopg2 parsing the JSON back into Python objects
+    execute_prepared(cursor, f"""
+        WITH page AS (
+            SELECT id, customer_id, first_name, last_name, email, role, status,
+                   invitation_code, invited_on, accepted_on,
+                   ROW_NUMBER() OVER (ORDER BY invited_on DESC, id DESC) AS rn
+            FROM (
+                SELECT * FROM invitations
+                {keyset}
+                ORDER BY invited_on DESC, id DESC
+                LIMIT %s
+            ) newest
+        )
+        SELECT COALESCE(json_agg(json_build_object(
+                   'customerId', customer_id,
+                   'firstName', first_name,
+                   'lastName', last_name,
+                   'email', email,
+                   'role', role,
+                   'status', status,
+                   'invitationCode', invitation_code,
+                   'invitedOn', to_char(invited_on AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS.US"Z"'),
+                   'acceptedOn', to_char(accepted_on AT TIME ZONE 'UTC', 'YYYY-MM-DD"T"HH24:MI:SS.US"Z"')
+               ) ORDER BY rn) FILTER (WHERE rn <= %s), '[]')::text,
+               COUNT(*) FILTER (WHERE rn <= %s),
+               COUNT(*) > %s,
+               MAX(invited_on) FILTER (WHERE rn = %s),
+               MAX(id) FILTER (WHERE rn = %s)
+        FROM page
+    """, params + [limit + 1, limit, limit, limit, limit, limit])
+    
+    invitations_json, count, has_more, last_invited_on, last_id = cursor.fetchone()
+    
+    next_cursor = encode_invitations_cursor(last_invited_on, last_id) if has_more else None
+    body = '{"invitations": ' + invitations_json + ', "nextCursor": ' + json.dumps(next_cursor)
+    if sync_token:
+        body += ', "syncToken": ' + json.dumps(sync_token)
+    return body + '}', count
+
+# Delta sync (GET /api/invitations?since=<token>). Tokens carry a database
+# clock watermark. updated_at is the writing transaction's start time, so each
+# sync re-reads INVITATIONS_SYNC_OVERLAP seconds before the watermark to catch
+# rows committed late; clients upsert by customerId, so repeats are harmless.
+INVITATIONS_SYNC_OVERLAP = float(os.environ.get('INVITATIONS_SYNC_OVERLAP', 30))
+INVITATIONS_SYNC_MAX_ROWS = int(os.environ.get('INVITATIONS_SYNC_MAX_ROWS', 1000))
+
+# How long invitation_deletions keeps tombstones (pruned by its trigger)
+INVITATIONS_SYNC_RETENTION = timedelta(days=30)
+
+def encode_sync_token(watermark):
+    """Encode a database timestamp as an opaque sync token"""
+    return base64.urlsafe_b64encode(json.dumps([watermark.isoformat()]).encode()).decode().rstrip('=')
+
+def decode_sync_token(token):
+    """Decode a sync token back into its timestamp; raises ValueError if malformed"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        watermark, = json.loads(base64.urlsafe_b64decode(padded))
+        watermark = datetime.fromisoformat(watermark)
+        if watermark.tzinfo is None:
+            raise ValueError("sync token has no time zone")
+        return watermark
+    except Exception as e:
+        raise ValueError(f"Invalid sync token: {token}") from e
+
+# 'Now' by the database clock and the sync watermark. On a streaming replica
+# the watermark is the last replayed commit, so a lagging replica never hands
+# out a token past changes it has not seen yet (NULL on a primary)
+SYNC_CLOCK_QUERY = """
+    SELECT CURRENT_TIMESTAMP,
+           LEAST(CURRENT_TIMESTAMP, COALESCE(pg_last_xact_replay_timestamp(), CURRENT_TIMESTAMP))
+"""
+
+def current_sync_token(cursor):
+    """A sync token for 'now' by the database clock"""
+    execute_prepared(cursor, SYNC_CLOCK_QUERY)
+    return encode_sync_token(cursor.fetchone()[1])
+
+def handle_sync_invitations(event, headers, since):
+    """Invitations inserted, changed or deleted since a sync token"""
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        # Get all invitations with customer_id, ordered by invited_on desc
-        cursor.execute("""
-            SELECT customer_id, first_name, last_name, email, role, status, 
-                   invitation_code, invited_on, accepted_on
-            FROM invitations 
-            ORDER BY invited_on DESC
-        """)
+        execute_prepared(cursor, SYNC_CLOCK_QUERY)
+        now, watermark = cursor.fetchone()
+        if now - since > INVITATIONS_SYNC_RETENTION:
+            cursor.close()
+            release_db_connection(conn)
+            return {
+                'statusCode': 410,
+                'headers': headers,
+                'body': json.dumps({'message': 'Sync token has expired - reload the full list'})
+            }
+        
+        window_start = since - timedelta(seconds=INVITATIONS_SYNC_OVERLAP)
         
+        # Served by idx_invitations_updated_at - cost follows churn, not table size
+        execute_prepared(cursor, f"""
+            SELECT {INVITATION_COLUMNS}
+            FROM invitations
+            WHERE updated_at > %s
+            ORDER BY updated_at, id
+            LIMIT %s
+        """, (window_start, INVITATIONS_SYNC_MAX_ROWS + 1))
         rows = cursor.fetchall()
         
-        invitations = []
-        for row in rows:
-            invitation = {
-                'customerId': row[0],  # Use actual customer_id from database
-                'firstName': row[1],
-                'lastName': row[2],
-                'email': row[3],
-                'role': row[4],
-                'status': row[5],
-                'invitationCode': row[6],
-                'invitedOn': row[7].isoformat() + 'Z' if row[7] else None,
-                'acceptedOn': row[8].isoformat() + 'Z' if row[8] else None
+        if len(rows) > INVITATIONS_SYNC_MAX_ROWS:
+            cursor.close()
+            release_db_connection(conn)
+            return {
+                'statusCode': 410,
+                'headers': headers,
+                'body': json.dumps({'message': 'Too many changes since the sync token - reload the full list'})
             }
-            invitations.append(invitation)
+        
+        execute_prepared(cursor, """
+            SELECT DISTINCT customer_id
+            FROM invitation_deletions
+            WHERE deleted_at > %s AND customer_id IS NOT NULL
+        """, (window_start,))
+        deleted = [row[0] for row in cursor.fetchall()]
         
         cursor.close()
-        conn.close()
+        release_db_connection(conn)
         
-        logger.info(f"Returning {len(invitations)} invitations")
+        logger.info(f"Sync since {since.isoformat()}: {len(rows)} changed, {len(deleted)} deleted")
         
         return {
             'statusCode': 200,
             'headers': headers,
-            'body': json.dumps(invitations)
+            'body': fast_json_dumps({
+                'invitations': [serialize_invitation(row) for row in rows],
+                'deleted': deleted,
+                'syncToken': encode_sync_token(watermark)
+            })
+        }
+        
+    except Exception as e:
+        logger.error(f"Sync invitations error: {e}")
+        return {
+            'statusCode': 500,
+            'headers': headers,
+            'body': json.dumps({'message': f'Failed to sync invitations: {str(e)}'})
+        }
+
+@router.route('GET', '/api/invitations', middleware=[replica_reads])
+def handle_get_invitations(event, headers):
+    """Get a page of invitations from database, newest first, optionally filtered"""
+    params = event.get('queryStringParameters') or {}
+    
+    if params.get('since'):
+        if any(params.get(name) for name in INVITATIONS_FILTER_PARAMS + ('cursor',)):
+            return {
+                'statusCode': 400,
+                'headers': headers,
+                'body': json.dumps({'message': 'since cannot be combined with filters or cursor'})
+            }
+        try:
+            since = decode_sync_token(params['since'])
+        except ValueError as e:
+            return {
+                'statusCode': 400,
+                'headers': headers,
+                'body': json.dumps({'message': str(e)})
+            }
+        return handle_sync_invitations(event, headers, since)
+    
+    try:
+        limit, position = parse_invitations_page(params)
+        filters = parse_invitations_filters(params)
+    except ValueError as e:
+        return {
+            'statusCode': 400,
+            'headers': headers,
+            'body': json.dumps({'message': str(e)})
+        }
+    
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        # Unchanged since the client's copy - skip the page query and serialization
+        etag = make_etag('invitations', get_invitations_version(cursor),
+                         limit, params.get('cursor'), INVITATIONS_JSON_MODE,
+                         *(params.get(name) for name in INVITATIONS_FILTER_PARAMS))
+        if etag_matches(event, etag):
+            cursor.close()
+            release_db_connection(conn)
+            return not_modified_response(headers, etag)
+        
+        # The first unfiltered page starts a client's delta sync
+        sync_token = current_sync_token(cursor) if position is None and not filters else None
+        
+        if INVITATIONS_JSON_MODE == 'database':
+            body, count = build_invitations_page_in_database(cursor, limit, position, filters, sync_token)
+        else:
+            body, count = build_invitations_page_in_python(cursor, limit, position, filters, sync_token)
+        
+        cursor.close()
+        release_db_connection(conn)
+        
+        logger.info(f"Returning {count} invitations")
+        
+        return {
+            'statusCode': 200,
+            'headers': with_etag(headers, etag),
+            'body': body
         }
         
     except Exception as e:
@@ -190,127 +954,241 @@ def handle_get_invitations(headers):
         return {
             'statusCode': 200,
             'headers': headers,
-            'body': json.dumps(sample_invitations)
+            'body': fast_json_dumps({
+                'invitations': sample_invitations,
+                'nextCursor': None
+            })
         }
 
-def generate_invitation_code():
-    """Generate a unique invitation code"""
-    return 'INV' + ''.join(random.choices(string.digits, k=4))
-
-def generate_customer_id():
-    """Generate next customer ID based on existing records"""
+@router.route('GET', '/api/invitations/{customerId}', middleware=[replica_reads])
+def handle_get_invitation(event, headers):
+    """Get one invitation by customer ID"""
+    customer_id = event['pathParameters']['customerId']
     try:
         conn = get_db_connection()
         cursor = conn.cursor()
-        
-        # Get the highest customer ID number
-        cursor.execute("""
-            SELECT customer_id FROM invitations 
-            WHERE customer_id LIKE 'CUST%'
-            ORDER BY CAST(SUBSTRING(customer_id FROM 5) AS INTEGER) DESC 
-            LIMIT 1
-        """)
-        
-        result = cursor.fetchone()
+        execute_prepared(cursor, f"""
+            SELECT {INVITATION_COLUMNS}
+            FROM invitations
+            WHERE customer_id = %s
+        """, (customer_id,))
+        row = cursor.fetchone()
         cursor.close()
-        conn.close()
+        release_db_connection(conn)
         
-        if result:
-            # Extract number from CUST001 format and increment
-            last_num = int(result[0][4:])
-            new_num = last_num + 1
-        else:
-            new_num = 1
+        if row is None:
+            return {
+                'statusCode': 404,
+                'headers': headers,
+                'body': json.dumps({'message': f'Invitation {customer_id} not found'})
+            }
         
-        return f"CUST{new_num:03d}"
+        return {
+            'statusCode': 200,
+            'headers': headers,
+            'body': fast_json_dumps(serialize_invitation(row))
+        }
         
     except Exception as e:
-        logger.error(f"Error generating customer ID: {e}")
-        # Fallback to random number
-        return f"CUST{random.randint(100, 999)}"
+        logger.error(f"Get invitation error: {e}")
+        return {
+            'statusCode': 500,
+            'headers': headers,
+            'body': json.dumps({'message': f'Failed to get invitation: {str(e)}'})
+        }
+
+def reserve_customer_ids(cursor, count):
+    """Reserve a block of customer IDs from the customer number sequence"""
+    cursor.execute("SELECT next_customer_id() FROM generate_series(1, %s)", (count,))
+    return [row[0] for row in cursor.fetchall()]
+
+def invitation_email_recipient(first_name, email, role, invitation_code):
+    """Build the per-recipient part of a batched invitation email"""
+    from email_templates import get_email_template
+    template = get_email_template('invitation', role)
+    return {
+        'email': email,
+        'subject': template.subject,
+        'substitutions': template.html.substitutions({
+            'firstName': first_name,
+            'invitationCode': invitation_code,
+            'email': email
+        })
+    }
+
+def send_invitation_batch(role, recipients):
+    """Send invitation emails for one role in a single API call; returns the message ID"""
+    from email_templates import get_email_template
+    from email_transport import get_email_transport
+    template = get_email_template('invitation', role)
+    with span('EmailSend'):
+        return get_email_transport().send_batch(
+            FROM_EMAIL, template.subject, template.html.tagged_content, recipients
+        )
 
 def send_invitation_email(first_name, last_name, email, role, invitation_code):
-    """Send invitation email via SendGrid"""
-    if not SENDGRID_API_KEY:
+    """Send a single invitation email, returning the provider message ID"""
+    from email_transport import email_transport_configured
+    if not email_transport_configured():
         logger.warning("SendGrid API key not configured")
         return
     
     try:
-        import sendgrid
-        from sendgrid.helpers.mail import Mail
-        
-        sg = sendgrid.SendGridAPIClient(api_key=SENDGRID_API_KEY)
-        
-        # Create email content
-        subject = f"Welcome to PeerBridge - Your {role.title()} Invitation"
-        
-        html_content = f"""
-        <html>
-        <body>
-            <h2>Welcome to PeerBridge!</h2>
-            <p>Hi {first_name},</p>
-            <p>You've been invited to join PeerBridge as a <strong>{role}</strong>.</p>
-            <p>Your invitation code is: <strong>{invitation_code}</strong></p>
-            <p>Click the link below to accept your invitation:</p>
-            <p><a href="https://peerbridge.ai/accept-invitation?code={invitation_code}&email={email}">Accept Invitation</a></p>
-            <p>Best regards,<br>The PeerBridge Team</p>
-        </body>
-        </html>
-        """
-        
-        message = Mail(
-            from_email='noreply@peerbridge.ai',
-            to_emails=email,
-            subject=subject,
-            html_content=html_content
-        )
-        
-        response = sg.send(message)
-        logger.info(f"Email sent to {email}, status: {response.status_code}")
+        message_id = send_invitation_batch(role, [
+            invitation_email_recipient(first_name, email, role, invitation_code)
+        ])
+        logger.info(f"Email sent to {email}, message id: {message_id}")
+        return message_id
         
     except Exception as e:
         logger.error(f"Failed to send email to {email}: {e}")
         raise e
 
+# Email outbox - invitation emails are queued in email_logs and sent by the drain
+EMAIL_OUTBOX_BATCH_SIZE = int(os.environ.get('EMAIL_OUTBOX_BATCH_SIZE', 500))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.environ.get('EMAIL_OUTBOX_MAX_ATTEMPTS', 5))
+
+def enqueue_invitation_emails(cursor, recipients):
+    """Queue invitation emails for (email, role) pairs in the caller's transaction"""
+    from psycopg2.extras import execute_values
+    from email_templates import get_email_template
+    execute_values(cursor, """
+        INSERT INTO email_logs (recipient_email, email_type, subject, status)
+        VALUES %s
+    """, [(email, 'invitation', get_email_template('invitation', role).subject, 'pending')
+          for email, role in recipients])
+
+def drain_email_outbox(context=None):
+    """Send pending invitation emails from the outbox in batches, with retries"""
+    from email_transport import chunk_recipients, email_transport_configured
+    summary = {'sent': 0, 'retrying': 0, 'failed': 0}
+    
+    if not email_transport_configured():
+        logger.warning("SendGrid API key not configured - leaving outbox pending")
+        return summary
+    
+    while True:
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        # Lock a batch; concurrent drains skip rows another drain holds
+        cursor.execute("""
+            SELECT l.id, l.recipient_email, i.first_name, i.role, i.invitation_code
+            FROM email_logs l
+            LEFT JOIN invitations i ON i.email = l.recipient_email
+            WHERE l.status = 'pending' AND l.email_type = 'invitation'
+              AND (l.next_attempt_at IS NULL OR l.next_attempt_at <= CURRENT_TIMESTAMP)
+            ORDER BY l.created_at
+            LIMIT %s
+            FOR UPDATE OF l SKIP LOCKED
+        """, (EMAIL_OUTBOX_BATCH_SIZE,))
+        batch = cursor.fetchall()
+        
+        orphaned = [row[0] for row in batch if row[4] is None]
+        if orphaned:
+            cursor.execute("""
+                UPDATE email_logs
+                SET status = 'failed', attempts = attempts + 1,
+                    error_message = 'Invitation no longer exists'
+                WHERE id = ANY(%s::uuid[])
+            """, (orphaned,))
+            summary['failed'] += len(orphaned)
+        
+        # The role is compiled into the body, so each API call carries one role
+        by_role = {}
+        for row in batch:
+            if row[4] is not None:
+                by_role.setdefault(row[3], []).append(row)
+        
+        chunks = [(role, rows) for role, group in by_role.items()
+                  for rows in chunk_recipients(group)]
+        for role, rows in chunks:
+            log_ids = [row[0] for row in rows]
+            try:
+                message_id = send_invitation_batch(role, [
+                    invitation_email_recipient(first_name, email, role, invitation_code)
+                    for _, email, first_name, role, invitation_code in rows
+                ])
+                cursor.execute("""
+                    UPDATE email_logs
+                    SET status = 'sent', sent_at = CURRENT_TIMESTAMP, attempts = attempts + 1,
+                        provider_message_id = %s, error_message = NULL
+                    WHERE id = ANY(%s::uuid[])
+                """, (message_id, log_ids))
+                summary['sent'] += len(rows)
+                
+            except Exception as e:
+                logger.error(f"Outbox batch of {len(rows)} failed: {e}")
+                # Exponential backoff: 2, 4, 8, ... minutes, then give up
+                cursor.execute("""
+                    UPDATE email_logs
+                    SET attempts = attempts + 1, error_message = %s,
+                        status = CASE WHEN attempts + 1 >= %s THEN 'failed' ELSE 'pending' END,
+                        next_attempt_at = CURRENT_TIMESTAMP + make_interval(mins => POWER(2, attempts + 1)::int)
+                    WHERE id = ANY(%s::uuid[])
+                    RETURNING status
+                """, (str(e), EMAIL_OUTBOX_MAX_ATTEMPTS, log_ids))
+                for (status,) in cursor.fetchall():
+                    summary['failed' if status == 'failed' else 'retrying'] += 1
+        
+        conn.commit()
+        cursor.close()
+        release_db_connection(conn)
+        
+        # Stop on a short batch, or when the invocation is about to time out
+        if len(batch) < EMAIL_OUTBOX_BATCH_SIZE:
+            break
+        if context is not None and context.get_remaining_time_in_millis() < 5000:
+            break
+    
+    logger.info(f"Email outbox drained: {summary}")
+    return summary
+
+# /api/email is the path the sales admin page posts to
+@router.route('POST', '/api/send-invitation', '/api/email')
 def handle_send_invitation(event, headers):
     """Send a single invitation"""
     try:
         body = json.loads(event.get('body', '{}'))
-        first_name = body.get('firstName', '').strip()
-        last_name = body.get('lastName', '').strip()
-        email = body.get('email', '').strip().lower()
-        role = body.get('role', '').strip().lower()
-        
-        logger.info(f"Sending invitation to: {first_name} {last_name} ({email}) as {role}")
-        
-        if not all([first_name, last_name, email, role]):
+        contact, error = validate_invitation(body)
+        if error:
             return {
                 'statusCode': 400,
                 'headers': headers,
-                'body': json.dumps({'message': 'All fields are required'})
+                'body': json.dumps({'message': error})
             }
+        first_name, last_name = contact['firstName'], contact['lastName']
+        email, role = contact['email'], contact['role']
         
-        # Generate invitation code and customer ID
-        invitation_code = generate_invitation_code()
-        customer_id = generate_customer_id()
+        logger.info(f"Sending invitation to: {first_name} {last_name} ({email}) as {role}")
         
-        # Save to database
+        # Customer ID and invitation code come from the column defaults.
+        # The email is queued in the same transaction, so if this fails
+        # nothing was sent and the client must retry
+        conn = None
         try:
             conn = get_db_connection()
             cursor = conn.cursor()
             
-            cursor.execute("""
-                INSERT INTO invitations (customer_id, first_name, last_name, email, role, invitation_code, status)
-                VALUES (%s, %s, %s, %s, %s, %s, 'sent')
-            """, (customer_id, first_name, last_name, email, role, invitation_code))
+            execute_prepared(cursor, """
+                INSERT INTO invitations (first_name, last_name, email, role, status)
+                VALUES (%s, %s, %s, %s, 'sent')
+                RETURNING customer_id, invitation_code
+            """, (first_name, last_name, email, role))
+            customer_id, invitation_code = cursor.fetchone()
+            
+            # Email goes out via the outbox drain once this commits
+            enqueue_invitation_emails(cursor, [(email, role)])
             
             conn.commit()
             cursor.close()
-            conn.close()
+            release_db_connection(conn)
             
+            record_write()
             logger.info(f"Invitation saved to database: {email} with customer_id: {customer_id}")
             
         except psycopg2.IntegrityError as e:
+            abandon_db_connection(conn)
             if 'email' in str(e):
                 return {
                     'statusCode': 400,
@@ -321,17 +1199,12 @@ def handle_send_invitation(event, headers):
                 raise e
         except Exception as e:
             logger.error(f"Database insert failed: {e}")
-            # Continue without database if it fails
-            pass
-        
-        # Send email (if SendGrid is configured)
-        if SENDGRID_API_KEY:
-            try:
-                send_invitation_email(first_name, last_name, email, role, invitation_code)
-                logger.info(f"Email sent successfully to {email}")
-            except Exception as e:
-                logger.error(f"Failed to send email: {e}")
-                # Don't fail the whole request if email fails
+            abandon_db_connection(conn)
+            return {
+                'statusCode': 503,
+                'headers': headers,
+                'body': json.dumps({'message': 'Invitation could not be saved and was not sent - please retry'})
+            }
         
         return {
             'statusCode': 200,
@@ -351,57 +1224,357 @@ def handle_send_invitation(event, headers):
             'body': json.dumps({'message': f'Failed to send invitation: {str(e)}'})
         }
 
-def handle_accept_invitation(event, headers):
-    """Accept an invitation in database"""
+# Roles accepted by the invitations.role CHECK constraint
+VALID_ROLES = ('entrepreneur', 'investor', 'affiliate')
+
+# Widths of the invitations.first_name, last_name and email columns
+INVITATION_FIELD_LENGTHS = (('firstName', 100), ('lastName', 100), ('email', 255))
+
+# Upper bound on contacts accepted by one bulk request
+BULK_INVITATIONS_MAX_ROWS = int(os.environ.get('BULK_INVITATIONS_MAX_ROWS', 1000))
+
+# CSV header aliases mapped onto the JSON field names
+CSV_FIELD_ALIASES = {
+    'firstname': 'firstName',
+    'first_name': 'firstName',
+    'first name': 'firstName',
+    'lastname': 'lastName',
+    'last_name': 'lastName',
+    'last name': 'lastName',
+    'email': 'email',
+    'role': 'role'
+}
+
+def parse_bulk_invitations(event):
+    """Parse a bulk request body (JSON array or CSV) into a list of contact dicts"""
+    import csv
+    import io
+    body = event.get('body') or ''
+    if event.get('isBase64Encoded'):
+        body = base64.b64decode(body).decode('utf-8')
+    
+    request_headers = {k.lower(): v for k, v in (event.get('headers') or {}).items()}
+    content_type = request_headers.get('content-type', '')
+    
+    if 'csv' in content_type or not body.lstrip().startswith(('[', '{')):
+        reader = csv.DictReader(io.StringIO(body.lstrip('\ufeff')))
+        contacts = []
+        for record in reader:
+            contact = {}
+            for key, value in record.items():
+                field = CSV_FIELD_ALIASES.get((key or '').strip().lower())
+                if field:
+                    contact[field] = value or ''
+            contacts.append(contact)
+        return contacts
+    
+    payload = json.loads(body)
+    if isinstance(payload, dict):
+        payload = payload.get('invitations')
+    if not isinstance(payload, list):
+        raise ValueError('Expected a JSON array of invitations')
+    return payload
+
+def validate_invitation(contact):
+    """Normalize one invitation contact; returns (row, error message)"""
+    if not isinstance(contact, dict):
+        return None, 'Invalid row'
+    
+    first_name = str(contact.get('firstName') or '').strip()
+    last_name = str(contact.get('lastName') or '').strip()
+    email = str(contact.get('email') or '').strip().lower()
+    role = str(contact.get('role') or '').strip().lower()
+    
+    if not all([first_name, last_name, email, role]):
+        return None, 'All fields are required'
+    if '@' not in email:
+        return None, 'Invalid email'
+    if role not in VALID_ROLES:
+        return None, f'Invalid role: {role}'
+    
+    row = {
+        'firstName': first_name,
+        'lastName': last_name,
+        'email': email,
+        'role': role
+    }
+    for field, length in INVITATION_FIELD_LENGTHS:
+        if len(row[field]) > length:
+            return None, f'{field} is longer than {length} characters'
+    return row, None
+
+@router.route('POST', '/api/send-invitations')
+def handle_send_invitations(event, headers):
+    """Send a batch of invitations in a single transaction"""
     try:
-        body = json.loads(event.get('body', '{}'))
-        email = body.get('email')
-        invitation_code = body.get('invitationCode')
-        
-        logger.info(f"Accepting invitation for: {email}")
-        
-        if not email:
-            return {
-                'statusCode': 400,
-                'headers': headers,
-                'body': json.dumps({'message': 'Email is required'})
-            }
-        
+        contacts = read_bulk_invitations(event)
+    except ValueError as e:
+        return {
+            'statusCode': 400,
+            'headers': headers,
+            'body': json.dumps({'message': str(e)})
+        }
+    
+    # Validate everything up front so bad rows never reach the database
+    results, pending = validate_bulk_invitations(contacts)
+    
+    logger.info(f"Bulk invitation request: {len(contacts)} rows, {len(pending)} valid")
+    
+    sent = []
+    if pending:
+        from psycopg2.extras import execute_values
         try:
             conn = get_db_connection()
             cursor = conn.cursor()
             
-            # Update invitation status
-            cursor.execute("""
-                UPDATE invitations 
-                SET status = 'accepted', accepted_on = CURRENT_TIMESTAMP
-                WHERE email = %s AND status != 'accepted'
-            """, (email,))
+            # Existing emails fail individually instead of aborting the batch
+            cursor.execute(
+                "SELECT email FROM invitations WHERE email = ANY(%s)",
+                ([row['email'] for _, row in pending],)
+            )
+            existing = {r[0] for r in cursor.fetchall()}
             
-            if cursor.rowcount == 0:
-                cursor.close()
-                conn.close()
-                return {
-                    'statusCode': 404,
-                    'headers': headers,
-                    'body': json.dumps({'message': 'Invitation not found or already accepted'})
-                }
+            to_insert = []
+            for result, row in pending:
+                if row['email'] in existing:
+                    result.update({'status': 'failed', 'message': 'Email already exists'})
+                else:
+                    to_insert.append((result, row))
+            
+            customer_ids = reserve_customer_ids(cursor, len(to_insert)) if to_insert else []
+            values = []
+            for (result, row), customer_id in zip(to_insert, customer_ids):
+                values.append((customer_id, row['firstName'], row['lastName'], row['email'],
+                               row['role'], 'sent'))
+            
+            # One multi-row statement; invitation codes come from the column
+            # default and rows hitting a unique constraint are skipped rather
+            # than rolling back the whole batch
+            inserted = {}
+            if values:
+                cursor.execute("SAVEPOINT bulk_insert")
+                try:
+                    returned = execute_values(cursor, """
+                        INSERT INTO invitations (customer_id, first_name, last_name, email, role, status)
+                        VALUES %s
+                        ON CONFLICT DO NOTHING
+                        RETURNING email, customer_id, invitation_code
+                    """, values, page_size=500, fetch=True)
+                    inserted = {r[0]: r for r in returned}
+                except (psycopg2.DataError, psycopg2.IntegrityError) as e:
+                    # A row the validation let through - find it one row at a time
+                    logger.warning(f"Bulk insert rejected a row, retrying row by row: {e}")
+                    cursor.execute("ROLLBACK TO SAVEPOINT bulk_insert")
+                    inserted = insert_bulk_invitations_by_row(cursor, to_insert, values)
+                
+                # Emails go out via the outbox drain once this commits
+                if inserted:
+                    enqueue_invitation_emails(cursor, [(row['email'], row['role'])
+                                                       for _, row in to_insert
+                                                       if row['email'] in inserted])
             
             conn.commit()
             cursor.close()
-            conn.close()
+            release_db_connection(conn)
+            
+            sent = record_bulk_invitations(to_insert, inserted)
             
         except Exception as e:
-            logger.error(f"Database update failed: {e}")
-            # Continue without database if it fails
-            pass
+            logger.error(f"Bulk invitation insert failed: {e}")
+            return {
+                'statusCode': 500,
+                'headers': headers,
+                'body': json.dumps({'message': f'Failed to send invitations: {str(e)}'})
+            }
+    
+    return bulk_invitations_response(headers, results, sent)
+
+def read_bulk_invitations(event):
+    """Parse a bulk request's rows, raising ValueError with the 400 message"""
+    import csv
+    try:
+        contacts = parse_bulk_invitations(event)
+    except (ValueError, csv.Error) as e:
+        raise ValueError(f'Invalid request body: {str(e)}')
+    
+    if not contacts:
+        raise ValueError('No invitations provided')
+    
+    if len(contacts) > BULK_INVITATIONS_MAX_ROWS:
+        raise ValueError(f'At most {BULK_INVITATIONS_MAX_ROWS} invitations per request')
+    return contacts
+
+def validate_bulk_invitations(contacts):
+    """Validate parsed rows; returns (per-row results, [(result, row)] still to insert)"""
+    results = []
+    pending = []
+    seen_emails = set()
+    for index, contact in enumerate(contacts):
+        row, error = validate_invitation(contact)
+        if row and row['email'] in seen_emails:
+            row, error = None, 'Duplicate email in request'
+        
+        result = {'row': index, 'email': contact.get('email') if isinstance(contact, dict) else None}
+        if error:
+            result.update({'status': 'failed', 'message': error})
+        else:
+            seen_emails.add(row['email'])
+            pending.append((result, row))
+        results.append(result)
+    return results, pending
+
+def insert_bulk_invitations_by_row(cursor, to_insert, values):
+    """Insert rows one by one, each under a savepoint so a bad row fails alone"""
+    inserted = {}
+    for (result, row), value in zip(to_insert, values):
+        cursor.execute("SAVEPOINT bulk_row")
+        try:
+            cursor.execute("""
+                INSERT INTO invitations (customer_id, first_name, last_name, email, role, status)
+                VALUES (%s, %s, %s, %s, %s, %s)
+                ON CONFLICT DO NOTHING
+                RETURNING email, customer_id, invitation_code
+            """, value)
+            returned = cursor.fetchone()
+            if returned:
+                inserted[returned[0]] = returned
+            cursor.execute("RELEASE SAVEPOINT bulk_row")
+        except (psycopg2.DataError, psycopg2.IntegrityError) as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT bulk_row")
+            result.update({'status': 'failed', 'message': f'Invalid row: {e.diag.message_primary or e}'})
+    return inserted
+
+def record_bulk_invitations(to_insert, inserted):
+    """Fill in results for attempted rows from {email: (email, customer_id, code)}; returns the sent rows"""
+    sent = []
+    for result, row in to_insert:
+        result['email'] = row['email']
+        if row['email'] in inserted:
+            _, row['customerId'], row['invitationCode'] = inserted[row['email']]
+            result.update({
+                'status': 'sent',
+                'customerId': row['customerId'],
+                'invitationCode': row['invitationCode']
+            })
+            sent.append(row)
+        elif result.get('status') != 'failed':
+            result.update({'status': 'failed', 'message': 'Invitation conflicts with an existing record'})
+    
+    if sent:
+        record_write()
+    return sent
+
+def bulk_invitations_response(headers, results, sent):
+    """The 200 summary of a bulk request"""
+    failed = len(results) - len(sent)
+    logger.info(f"Bulk invitations: {len(sent)} sent, {failed} failed")
+    
+    return {
+        'statusCode': 200,
+        'headers': headers,
+        'body': json.dumps({
+            'message': f'{len(sent)} invitations sent, {failed} failed',
+            'sent': len(sent),
+            'failed': failed,
+            'results': results
+        })
+    }
+
+@router.route('POST', '/api/accept-invitation', '/api/invitation/accept',
+              '/api/invitation/accept/{invitationCode}')
+def handle_accept_invitation(event, headers):
+    """Accept an invitation by code and email; repeating an accept is a no-op"""
+    try:
+        body = json.loads(event.get('body') or '{}')
+        email = (body.get('email') or '').strip().lower()
+        path_params = event.get('pathParameters') or {}
+        invitation_code = (body.get('invitationCode') or path_params.get('invitationCode') or '').strip()
         
-        logger.info(f"Updated invitation status for {email}")
+        logger.info(f"Accepting invitation {invitation_code} for: {email}")
+        
+        if not email or not invitation_code:
+            return {
+                'statusCode': 400,
+                'headers': headers,
+                'body': json.dumps({'message': 'Email and invitation code are required'})
+            }
+        
+        conn = get_db_connection()
+        cursor = conn.cursor()
+        
+        # One statement: accept a live invitation matched by its unique code,
+        # or - when nothing was updated - return the row as it stands so a
+        # repeat accept reads without writing. Expiry uses the database clock.
+        execute_prepared(cursor, f"""
+            WITH accepted AS (
+                UPDATE invitations
+                SET status = 'accepted', accepted_on = CURRENT_TIMESTAMP
+                WHERE invitation_code = %s AND lower(email) = %s
+                  AND status IN ('pending', 'sent')
+                  AND (expires_on IS NULL OR expires_on > CURRENT_TIMESTAMP)
+                RETURNING {INVITATION_COLUMNS}, TRUE AS changed, FALSE AS expired
+            )
+            SELECT * FROM accepted
+            UNION ALL
+            SELECT {INVITATION_COLUMNS}, FALSE, expires_on <= CURRENT_TIMESTAMP
+            FROM invitations
+            WHERE invitation_code = %s AND lower(email) = %s
+              AND NOT EXISTS (SELECT 1 FROM accepted)
+        """, (invitation_code, email, invitation_code, email))
+        row = cursor.fetchone()
+        conn.commit()
+        
+        if row is not None and not row[10] and row[6] in ('pending', 'sent') and not row[11]:
+            # A concurrent accept updated the row after this statement's
+            # snapshot was taken - read it back as it is now
+            execute_prepared(cursor, f"""
+                SELECT {INVITATION_COLUMNS}, FALSE, FALSE
+                FROM invitations
+                WHERE invitation_code = %s
+            """, (invitation_code,))
+            row = cursor.fetchone()
+            conn.commit()
+        
+        cursor.close()
+        release_db_connection(conn)
+        
+        if row is None:
+            return {
+                'statusCode': 404,
+                'headers': headers,
+                'body': json.dumps({'message': 'Invitation not found'})
+            }
+        
+        invitation = serialize_invitation(row)
+        changed, expired = row[10], row[11]
+        
+        if changed:
+            record_write()
+            logger.info(f"Updated invitation status for {email}")
+            message = 'Invitation accepted successfully'
+        elif invitation['status'] == 'accepted':
+            message = 'Invitation already accepted'
+        elif expired or invitation['status'] == 'expired':
+            return {
+                'statusCode': 410,
+                'headers': headers,
+                'body': json.dumps({'message': 'Invitation has expired'})
+            }
+        else:
+            return {
+                'statusCode': 409,
+                'headers': headers,
+                'body': json.dumps({'message': f"Invitation cannot be accepted (status: {invitation['status']})"})
+            }
         
         return {
             'statusCode': 200,
             'headers': headers,
-            'body': json.dumps({'message': 'Invitation accepted successfully'})
+            'body': fast_json_dumps({
+                'message': message,
+                'alreadyAccepted': not changed,
+                'invitation': invitation
+            })
         }
         
     except Exception as e:
@@ -412,11 +1585,72 @@ def handle_accept_invitation(event, headers):
             'body': json.dumps({'message': f'Failed to accept invitation: {str(e)}'})
         }
 
+# Response compression - bodies smaller than this are sent as-is
+COMPRESSION_MIN_BYTES = int(os.environ.get('COMPRESSION_MIN_BYTES', 1024))
+
+def choose_content_encoding(accept_encoding):
+    """Pick 'br' or 'gzip' from an Accept-Encoding header, or None"""
+    accepted = {}
+    for item in (accept_encoding or '').split(','):
+        token, _, params = item.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if token:
+            accepted[token.strip().lower()] = quality
+    
+    wildcard = accepted.get('*', 0.0)
+    if accepted.get('br', wildcard) > 0 and load_brotli() is not None:
+        return 'br'
+    if accepted.get('gzip', wildcard) > 0:
+        return 'gzip'
+    return None
+
+def compress_response(event, response):
+    """Compress a proxy response body when the client accepts it and it is big enough"""
+    body = response.get('body')
+    if not body or response.get('isBase64Encoded') or len(body) < COMPRESSION_MIN_BYTES:
+        return response
+    
+    request_headers = {k.lower(): v for k, v in (event.get('headers') or {}).items()}
+    encoding = choose_content_encoding(request_headers.get('accept-encoding'))
+    if encoding is None:
+        return response
+    
+    raw = body.encode('utf-8')
+    if encoding == 'br':
+        compressed = load_brotli().compress(raw, quality=5)
+    else:
+        import gzip
+        compressed = gzip.compress(raw, compresslevel=5)
+    
+    headers = dict(response.get('headers') or {})
+    headers.setdefault('Content-Type', 'application/json')
+    headers['Content-Encoding'] = encoding
+    headers['Vary'] = 'Accept-Encoding'
+    
+    return dict(
+        response,
+        headers=headers,
+        body=base64.b64encode(compressed).decode('ascii'),
+        isBase64Encoded=True
+    )
+
 def lambda_handler(event, context):
     """Main Lambda handler"""
     
-    # Initialize database on first run
-    initialize_database()
+    # Verify the schema on cold start; a direct invoke with
+    # {"forceSchemaCheck": true} re-runs it after a migration
+    initialize_database(force=bool(event.get('forceSchemaCheck')))
+    
+    # Scheduled outbox drain - EventBridge rule input {"action": "drain-email-outbox"}
+    if event.get('action') == 'drain-email-outbox':
+        with request('drain-email-outbox'):
+            return drain_email_outbox(context)
     
     # Get CORS headers
     headers = get_cors_headers()
@@ -434,23 +1668,18 @@ def lambda_handler(event, context):
     method = event.get('httpMethod', '')
     
     logger.info(f"Request: {method} {path}")
+    logger.info(f"DB connection cache: {json.dumps(get_db_connection_stats())}")
+    
+    # With binary media types enabled, API Gateway may base64 the request body
+    if event.get('isBase64Encoded') and event.get('body'):
+        event = dict(event, body=base64.b64decode(event['body']).decode('utf-8'), isBase64Encoded=False)
     
+    return compress_response(event, route_request(event, headers))
+
+def route_request(event, headers):
+    """Dispatch an API Gateway request through the route table"""
     try:
-        # Route requests
-        if path == '/api/dashboard-stats' and method == 'GET':
-            return handle_get_dashboard_stats(headers)
-        elif path == '/api/invitations' and method == 'GET':
-            return handle_get_invitations(headers)
-        elif path == '/api/send-invitation' and method == 'POST':
-            return handle_send_invitation(event, headers)
-        elif path == '/api/accept-invitation' and method == 'POST':
-            return handle_accept_invitation(event, headers)
-        else:
-            return {
-                'statusCode': 404,
-                'headers': headers,
-                'body': json.dumps({'message': 'Endpoint not found'})
-            }
+        return router.dispatch(event, headers)
             
     except Exception as e:
         logger.error(f"Unhandled error: {e}")
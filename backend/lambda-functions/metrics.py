@@ -0,0 +1,120 @@
+import os
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+from routes import is_coroutine_function
+
+# Per-phase request timings, emitted as CloudWatch Embedded Metric Format
+# (EMF) log lines. CloudWatch turns each line into metrics under
+# METRICS_NAMESPACE with a Route dimension - no PutMetricData calls needed.
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+METRICS_NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'PeerBridge')
+
+_state = threading.local()
+_sink = None
+_capturing = False
+
+class RequestMetrics:
+    """Milliseconds and call counts per phase for one request"""
+
+    def __init__(self, route):
+        self.route = route
+        self.timings = {}
+        self.counts = {}
+
+    def add(self, phase, elapsed_ms):
+        self.timings[phase] = self.timings.get(phase, 0.0) + elapsed_ms
+        self.counts[phase] = self.counts.get(phase, 0) + 1
+
+    def to_emf(self):
+        """The EMF document for this request"""
+        definitions = []
+        document = {'Route': self.route}
+        for phase, elapsed_ms in self.timings.items():
+            definitions.append({'Name': phase, 'Unit': 'Milliseconds'})
+            definitions.append({'Name': f'{phase}Count', 'Unit': 'Count'})
+            document[phase] = round(elapsed_ms, 3)
+            document[f'{phase}Count'] = self.counts[phase]
+        document['_aws'] = {
+            'Timestamp': int(time.time() * 1000),
+            'CloudWatchMetrics': [{
+                'Namespace': METRICS_NAMESPACE,
+                'Dimensions': [['Route']],
+                'Metrics': definitions
+            }]
+        }
+        return document
+
+def emit_to_stdout(document):
+    """Write an EMF document as one stdout line - the form Lambda's log agent extracts"""
+    sys.stdout.write(json.dumps(document) + '\n')
+    sys.stdout.flush()
+
+def current_request():
+    """The RequestMetrics being collected on this thread, or None"""
+    return getattr(_state, 'current', None)
+
+@contextmanager
+def request(route):
+    """Collect spans for one request and emit them when it finishes"""
+    if not (METRICS_ENABLED or _capturing):
+        yield None
+        return
+
+    collector = RequestMetrics(route)
+    previous = current_request()
+    _state.current = collector
+    start = time.perf_counter()
+    try:
+        yield collector
+    finally:
+        collector.add('Total', (time.perf_counter() - start) * 1000)
+        _state.current = previous
+        (_sink or emit_to_stdout)(collector.to_emf())
+
+@contextmanager
+def span(phase):
+    """Time a block as `phase` of the current request (no-op outside one)"""
+    collector = current_request()
+    if collector is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        collector.add(phase, (time.perf_counter() - start) * 1000)
+
+def instrumented(handler):
+    """Route middleware collecting a request's spans under its route key"""
+    if is_coroutine_function(handler):
+        async def wrapper(event, headers):
+            with request(event.get('routeKey') or handler.__name__):
+                return await handler(event, headers)
+    else:
+        def wrapper(event, headers):
+            with request(event.get('routeKey') or handler.__name__):
+                return handler(event, headers)
+    wrapper.__name__ = handler.__name__
+    return wrapper
+
+@contextmanager
+def capture_metrics():
+    """Collect emitted EMF documents in a list instead of stdout, even when disabled
+
+        with capture_metrics() as documents:
+            lambda_handler(event, None)
+        assert documents[0]['Route'] == 'GET /api/invitations'
+    """
+    global _sink, _capturing
+    documents = []
+    previous = (_sink, _capturing)
+    _sink, _capturing = documents.append, True
+    try:
+        yield documents
+    finally:
+        _sink, _capturing = previous
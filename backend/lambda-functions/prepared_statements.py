@@ -0,0 +1,70 @@
+import os
+import re
+import hashlib
+import itertools
+
+import psycopg2
+import psycopg2.errors
+import psycopg2.extensions
+
+# Hot queries run as server-side prepared statements, parsed and planned once
+# per connection. Turn off behind a pooler that resets sessions between
+# transactions (PgBouncer in transaction mode).
+PREPARED_STATEMENTS_ENABLED = os.environ.get('DB_PREPARED_STATEMENTS', 'true').lower() in ('1', 'true', 'yes')
+
+PLACEHOLDER_PATTERN = re.compile(r'%%|%s')
+
+# The registry: SQL text -> statement name, shared by every connection
+_statement_names = {}
+
+class PreparingConnection(psycopg2.extensions.connection):
+    """Connection tracking which registry statements it has prepared
+
+    The set lives and dies with the connection, so a reconnect starts with
+    nothing prepared.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared_statements = set()
+
+def statement_name(query):
+    """Registry name for a query, stable across connections and containers"""
+    name = _statement_names.get(query)
+    if name is None:
+        name = 'pb_' + hashlib.sha1(query.encode()).hexdigest()[:16]
+        _statement_names[query] = name
+    return name
+
+def registered_queries():
+    """Every query that has gone through execute_prepared in this process"""
+    return list(_statement_names)
+
+def to_positional(query):
+    """Rewrite psycopg2 %s placeholders as PREPARE's $1, $2, ..."""
+    numbers = itertools.count(1)
+    return PLACEHOLDER_PATTERN.sub(lambda m: '%' if m.group() == '%%' else f'${next(numbers)}', query)
+
+def prepare(cursor, query):
+    """PREPARE query on the cursor's connection unless it already is; returns its name"""
+    name = statement_name(query)
+    prepared = cursor.connection.prepared_statements
+    if name not in prepared:
+        cursor.execute(f"PREPARE {name} AS {to_positional(query)}")
+        prepared.add(name)
+    return name
+
+def execute_prepared(cursor, query, params=None):
+    """cursor.execute(query, params), via a statement prepared once per connection"""
+    name = statement_name(query)
+    if not PREPARED_STATEMENTS_ENABLED or not hasattr(cursor.connection, 'prepared_statements'):
+        return cursor.execute(query, params)
+
+    prepare(cursor, query)
+    arguments = f" ({', '.join(['%s'] * len(params))})" if params else ""
+    try:
+        cursor.execute(f"EXECUTE {name}{arguments}", params or None)
+    except psycopg2.errors.InvalidSqlStatementName:
+        # The session was reset under us (DISCARD ALL) - prepare afresh next time
+        cursor.connection.prepared_statements.clear()
+        raise
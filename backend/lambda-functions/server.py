@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Run the PeerBridge API as a long-lived HTTP server
+
+Serves the same routes as the Lambda: each HTTP request is turned into an
+API Gateway proxy event and passed to lambda_handler. A fixed set of worker
+threads handles requests, and all of them share one bounded
+ThreadedConnectionPool instead of the Lambda's per-container connection
+(plus a second pool for the read replica, when one is configured).
+
+    DB_HOST=... DB_NAME=... python server.py --port 8080
+
+GET /healthz reports pool size, connections in use, queue waits and
+timeouts. The email outbox, drained by an EventBridge rule on Lambda, is
+drained by a background thread every EMAIL_OUTBOX_DRAIN_INTERVAL seconds.
+"""
+import os
+import json
+import base64
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import lambda_function_final as api
+from db_pool import BoundedConnectionPool
+
+logger = logging.getLogger()
+
+SERVER_HOST = os.environ.get('SERVER_HOST', '0.0.0.0')
+SERVER_PORT = int(os.environ.get('SERVER_PORT', 8080))
+SERVER_THREADS = int(os.environ.get('SERVER_THREADS', 16))
+
+DB_POOL_MIN = int(os.environ.get('DB_POOL_MIN', 1))
+DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 5))
+DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 30))
+
+EMAIL_OUTBOX_DRAIN_INTERVAL = float(os.environ.get('EMAIL_OUTBOX_DRAIN_INTERVAL', 60))
+
+def build_event(method, raw_path, headers, body):
+    """An API Gateway REST proxy event for one HTTP request"""
+    url = urlsplit(raw_path)
+    query = dict(parse_qsl(url.query, keep_blank_values=True)) or None
+    event = {
+        'httpMethod': method,
+        'path': url.path,
+        'headers': dict(headers),
+        'queryStringParameters': query,
+        'pathParameters': None,
+        'body': None,
+        'isBase64Encoded': False,
+        'requestContext': {'stage': 'server'}
+    }
+    if body:
+        try:
+            event['body'] = body.decode('utf-8')
+        except UnicodeDecodeError:
+            event['body'] = base64.b64encode(body).decode('ascii')
+            event['isBase64Encoded'] = True
+    return event
+
+class APIRequestHandler(BaseHTTPRequestHandler):
+    """Translate HTTP requests to lambda_handler calls and back"""
+
+    protocol_version = 'HTTP/1.1'
+
+    # Headers and body go out in separate writes; with Nagle on, the body
+    # waits for the client's delayed ACK of the headers (~40 ms per response)
+    disable_nagle_algorithm = True
+
+    # A client that connects and sends nothing gives its worker thread back after this
+    timeout = 5
+
+    def handle_request(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+
+        if self.command == 'GET' and self.path == '/healthz':
+            response = {
+                'statusCode': 200,
+                'headers': {'Content-Type': 'application/json'},
+                'body': json.dumps({'status': 'ok', 'db': api.get_db_connection_stats()})
+            }
+        else:
+            event = build_event(self.command, self.path, self.headers.items(), body)
+            try:
+                response = api.lambda_handler(event, None)
+            finally:
+                # Hand back anything a failed handler left checked out
+                for pool in self.server.pools:
+                    pool.release_thread_connections()
+
+        self.write_response(response)
+
+    def write_response(self, response):
+        payload = response.get('body') or ''
+        payload = base64.b64decode(payload) if response.get('isBase64Encoded') else payload.encode('utf-8')
+
+        self.send_response(response.get('statusCode', 200))
+        headers = response.get('headers') or {}
+        for name, value in headers.items():
+            self.send_header(name, value)
+        if not any(name.lower() == 'content-type' for name in headers):
+            self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        # A kept-alive connection would hold its worker thread while idle and
+        # stall new clients once there are more clients than threads
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(payload)
+
+    do_GET = do_POST = do_PUT = do_DELETE = do_OPTIONS = do_HEAD = handle_request
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer that handles connections on a fixed pool of worker threads"""
+
+    # Clients connect once per request; socketserver's default backlog of 5
+    # drops SYNs under load and costs the client a 1 s retransmit
+    request_queue_size = 128
+
+    def __init__(self, address, handler_class, pool, threads=SERVER_THREADS, read_pool=None):
+        super().__init__(address, handler_class)
+        self.pool = pool
+        self.read_pool = read_pool
+        self.pools = [pool] + ([read_pool] if read_pool is not None else [])
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='api')
+
+    def process_request(self, request, client_address):
+        self.executor.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown(wait=True)
+
+def drain_outbox_periodically(pools, interval, stop):
+    """Drain the email outbox every `interval` seconds until `stop` is set"""
+    while not stop.wait(interval):
+        try:
+            api.lambda_handler({'action': 'drain-email-outbox'}, None)
+        except Exception as e:
+            logger.error(f"Outbox drain failed: {e}")
+        finally:
+            for pool in pools:
+                pool.release_thread_connections()
+
+def create_server(host=SERVER_HOST, port=SERVER_PORT, threads=SERVER_THREADS, pool=None, read_pool=None):
+    """Build a server whose handlers share `pool` (a BoundedConnectionPool by default)
+
+    With a read replica configured, replica_reads routes take their
+    connections from `read_pool`, opened on first use.
+    """
+    if pool is None:
+        pool = BoundedConnectionPool(DB_POOL_MIN, DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT,
+                                     **api.db_connect_kwargs())
+    if read_pool is None and api.read_replica_configured():
+        # Opens replica connections on first use and keeps them, like the primary pool
+        read_pool = BoundedConnectionPool(0, DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT,
+                                          **api.db_read_connect_kwargs())
+    api.set_db_pool(pool, read_pool)
+    api.initialize_database()
+    return PooledHTTPServer((host, port), APIRequestHandler, pool, threads, read_pool)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default=SERVER_HOST)
+    parser.add_argument('--port', type=int, default=SERVER_PORT)
+    parser.add_argument('--threads', type=int, default=SERVER_THREADS)
+    parser.add_argument('--drain-interval', type=float, default=EMAIL_OUTBOX_DRAIN_INTERVAL,
+                        help='seconds between email outbox drains (0 disables)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    server = create_server(args.host, args.port, args.threads)
+    stop = threading.Event()
+    if args.drain_interval > 0:
+        threading.Thread(target=drain_outbox_periodically, args=(server.pools, args.drain_interval, stop),
+                         name='outbox-drain', daemon=True).start()
+    logger.info(f"Serving on {args.host}:{args.port} with {args.threads} threads, "
+                f"{DB_POOL_SIZE} database connections")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
+        for pool in server.pools:
+            pool.closeall()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+-- Allocate invitation customer IDs from a sequence instead of MAX()+1
+-- Safe to re-run
+
+BEGIN;
+
+CREATE SEQUENCE IF NOT EXISTS invitations_customer_number_seq;
+
+CREATE OR REPLACE FUNCTION next_customer_id()
+RETURNS VARCHAR AS $$
+    SELECT 'CUST' || LPAD(n::text, GREATEST(3, LENGTH(n::text)), '0')
+    FROM nextval('invitations_customer_number_seq') AS n;
+$$ LANGUAGE sql;
+
+-- Block concurrent inserts while the sequence catches up with existing IDs
+LOCK TABLE invitations IN SHARE ROW EXCLUSIVE MODE;
+
+SELECT setval('invitations_customer_number_seq',
+              GREATEST(
+                  COALESCE((SELECT MAX(CAST(SUBSTRING(customer_id FROM 5) AS INTEGER))
+                            FROM invitations WHERE customer_id ~ '^CUST[0-9]+$'), 0) + 1,
+                  nextval('invitations_customer_number_seq')),
+              false);
+
+ALTER TABLE invitations ALTER COLUMN customer_id SET DEFAULT next_customer_id();
+
+COMMIT;
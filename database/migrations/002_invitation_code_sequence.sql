@@ -0,0 +1,20 @@
+-- Generate invitation codes in the database from a sequence plus a random
+-- suffix, replacing the 10,000-code 'INV' + 4 digits scheme
+-- Safe to re-run; existing codes are left unchanged
+
+BEGIN;
+
+CREATE EXTENSION IF NOT EXISTS "pgcrypto";
+
+CREATE SEQUENCE IF NOT EXISTS invitations_code_seq;
+
+CREATE OR REPLACE FUNCTION next_invitation_code()
+RETURNS VARCHAR AS $$
+    SELECT 'INV' || UPPER(LPAD(to_hex(n), GREATEST(6, LENGTH(to_hex(n))), '0'))
+                 || UPPER(encode(gen_random_bytes(4), 'hex'))
+    FROM nextval('invitations_code_seq') AS n;
+$$ LANGUAGE sql;
+
+ALTER TABLE invitations ALTER COLUMN invitation_code SET DEFAULT next_invitation_code();
+
+COMMIT;
@@ -0,0 +1,12 @@
+-- Turn email_logs into the invitation email outbox: retry bookkeeping and
+-- a partial index over pending rows for the drain
+-- Safe to re-run
+
+BEGIN;
+
+ALTER TABLE email_logs ADD COLUMN IF NOT EXISTS attempts INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE email_logs ADD COLUMN IF NOT EXISTS next_attempt_at TIMESTAMP WITH TIME ZONE NULL;
+
+CREATE INDEX IF NOT EXISTS idx_email_logs_outbox ON email_logs(created_at) WHERE status = 'pending';
+
+COMMIT;
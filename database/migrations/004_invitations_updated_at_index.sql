@@ -0,0 +1,5 @@
+-- Index invitations.updated_at so MAX(updated_at) in the ETag version token
+-- (get_invitations_version) and delta sync are answered from the index
+-- Safe to re-run; CONCURRENTLY avoids blocking writes (run outside a transaction)
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_invitations_updated_at ON invitations(updated_at);
@@ -0,0 +1,11 @@
+-- Indexes behind the GET /api/invitations filters (status, role, q search)
+-- The search expression must match INVITATION_SEARCH_EXPRESSION in
+-- lambda_function_final.py for the trigram index to be used
+-- Safe to re-run; CONCURRENTLY avoids blocking writes (run outside a transaction)
+
+CREATE EXTENSION IF NOT EXISTS "pg_trgm";
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_invitations_status_invited_on ON invitations(status, invited_on, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_invitations_role_invited_on ON invitations(role, invited_on, id);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_invitations_search_trgm ON invitations
+    USING gin ((lower(first_name || ' ' || last_name || ' ' || email)) gin_trgm_ops);
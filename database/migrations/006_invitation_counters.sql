@@ -0,0 +1,116 @@
+-- Trigger-maintained invitation counters (status x role) behind
+-- invitation_stats / GET /api/dashboard-stats
+-- Safe to re-run: triggers are recreated and the counters recomputed while
+-- writes to invitations are blocked
+
+BEGIN;
+
+LOCK TABLE invitations IN SHARE ROW EXCLUSIVE MODE;
+
+-- Invitation counts by status x role, kept current by statement-level
+-- triggers so dashboard stats read a few rows instead of scanning
+-- invitations. Each statement applies one aggregated delta per (status,
+-- role), so a bulk insert touches each counter row once.
+-- reconcile_invitation_counters() recomputes them from scratch.
+CREATE TABLE IF NOT EXISTS invitation_counters (
+    status VARCHAR(20) NOT NULL,
+    role VARCHAR(50) NOT NULL,
+    count BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (status, role)
+);
+
+CREATE OR REPLACE FUNCTION update_invitation_counters()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        DELETE FROM invitation_counters;
+        RETURN NULL;
+    END IF;
+
+    -- Counter rows are locked in (status, role) order to avoid deadlocks
+    -- between concurrent statements
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO invitation_counters AS c (status, role, count)
+        SELECT COALESCE(status, 'none'), role, COUNT(*)
+        FROM new_rows GROUP BY 1, 2 ORDER BY 1, 2
+        ON CONFLICT (status, role) DO UPDATE SET count = c.count + EXCLUDED.count;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO invitation_counters AS c (status, role, count)
+        SELECT COALESCE(status, 'none'), role, -COUNT(*)
+        FROM old_rows GROUP BY 1, 2 ORDER BY 1, 2
+        ON CONFLICT (status, role) DO UPDATE SET count = c.count + EXCLUDED.count;
+    ELSE
+        -- Updates that leave status and role alone net out to no write
+        INSERT INTO invitation_counters AS c (status, role, count)
+        SELECT status, role, SUM(delta)
+        FROM (
+            SELECT COALESCE(status, 'none') AS status, role, 1 AS delta FROM new_rows
+            UNION ALL
+            SELECT COALESCE(status, 'none'), role, -1 FROM old_rows
+        ) deltas
+        GROUP BY 1, 2 HAVING SUM(delta) <> 0 ORDER BY 1, 2
+        ON CONFLICT (status, role) DO UPDATE SET count = c.count + EXCLUDED.count;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS invitation_counters_insert ON invitations;
+DROP TRIGGER IF EXISTS invitation_counters_update ON invitations;
+DROP TRIGGER IF EXISTS invitation_counters_delete ON invitations;
+DROP TRIGGER IF EXISTS invitation_counters_truncate ON invitations;
+
+CREATE TRIGGER invitation_counters_insert AFTER INSERT ON invitations
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_invitation_counters();
+CREATE TRIGGER invitation_counters_update AFTER UPDATE ON invitations
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_invitation_counters();
+CREATE TRIGGER invitation_counters_delete AFTER DELETE ON invitations
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_invitation_counters();
+CREATE TRIGGER invitation_counters_truncate AFTER TRUNCATE ON invitations
+    FOR EACH STATEMENT EXECUTE FUNCTION update_invitation_counters();
+
+-- Recompute every counter from invitations; returns the rows that drifted
+-- (expected is the true count, counted what the table held). Blocks writes
+-- to invitations for the duration of the calling transaction.
+CREATE OR REPLACE FUNCTION reconcile_invitation_counters()
+RETURNS TABLE (status VARCHAR, role VARCHAR, expected BIGINT, counted BIGINT) AS $$
+#variable_conflict use_column
+BEGIN
+    LOCK TABLE invitations IN SHARE MODE;
+    LOCK TABLE invitation_counters IN EXCLUSIVE MODE;
+
+    RETURN QUERY
+    WITH actual AS (
+        SELECT COALESCE(i.status, 'none')::VARCHAR AS status, i.role::VARCHAR AS role, COUNT(*) AS count
+        FROM invitations i GROUP BY 1, 2
+    )
+    SELECT COALESCE(a.status, c.status)::VARCHAR, COALESCE(a.role, c.role)::VARCHAR,
+           COALESCE(a.count, 0), COALESCE(c.count, 0)
+    FROM actual a
+    FULL JOIN invitation_counters c ON c.status = a.status AND c.role = a.role
+    WHERE COALESCE(a.count, 0) <> COALESCE(c.count, 0);
+
+    DELETE FROM invitation_counters;
+    INSERT INTO invitation_counters (status, role, count)
+    SELECT COALESCE(i.status, 'none'), i.role, COUNT(*)
+    FROM invitations i GROUP BY 1, 2;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Backfill (drift against the empty table is every existing row)
+SELECT COUNT(*) AS recomputed_counters FROM reconcile_invitation_counters();
+
+-- Reads the trigger-maintained counters - a handful of rows at any table size
+CREATE OR REPLACE VIEW invitation_stats AS
+SELECT 
+    COALESCE(SUM(count), 0)::BIGINT as total_invitations,
+    COALESCE(SUM(count) FILTER (WHERE status = 'accepted'), 0)::BIGINT as accepted_invitations,
+    COALESCE(SUM(count) FILTER (WHERE status IN ('sent', 'pending')), 0)::BIGINT as pending_invitations,
+    COALESCE(SUM(count) FILTER (WHERE status = 'expired'), 0)::BIGINT as expired_invitations,
+    COALESCE(SUM(count) FILTER (WHERE status = 'rejected'), 0)::BIGINT as rejected_invitations
+FROM invitation_counters;
+
+COMMIT;
@@ -0,0 +1,35 @@
+-- Delete tracking for invitations delta sync; pairs with
+-- idx_invitations_updated_at (migration 004) for inserted/changed rows
+-- Safe to re-run
+
+BEGIN;
+
+-- Tombstones for delta sync (GET /api/invitations?since=...): deleted
+-- invitations are recorded here so clients can drop them. The trigger also
+-- prunes tombstones past the 30-day retention (INVITATIONS_SYNC_RETENTION)
+CREATE TABLE IF NOT EXISTS invitation_deletions (
+    invitation_id INTEGER NOT NULL,
+    customer_id VARCHAR(20) NULL,
+    deleted_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_invitation_deletions_deleted_at ON invitation_deletions(deleted_at);
+
+CREATE OR REPLACE FUNCTION record_invitation_deletions()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO invitation_deletions (invitation_id, customer_id)
+    SELECT id, customer_id FROM old_rows;
+
+    DELETE FROM invitation_deletions WHERE deleted_at < CURRENT_TIMESTAMP - INTERVAL '30 days';
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS invitation_deletions_record ON invitations;
+
+CREATE TRIGGER invitation_deletions_record AFTER DELETE ON invitations
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION record_invitation_deletions();
+
+COMMIT;
@@ -0,0 +1,15 @@
+-- Make invitations.invited_on NOT NULL: GET /api/invitations pages on
+-- (invited_on, id), and a NULL at a page boundary cannot be encoded as a
+-- cursor (nor compared with one). Rows without it take their created_at
+-- Safe to re-run
+
+BEGIN;
+
+UPDATE invitations
+SET invited_on = COALESCE(created_at, CURRENT_TIMESTAMP)
+WHERE invited_on IS NULL;
+
+ALTER TABLE invitations ALTER COLUMN invited_on SET DEFAULT CURRENT_TIMESTAMP;
+ALTER TABLE invitations ALTER COLUMN invited_on SET NOT NULL;
+
+COMMIT;
@@ -0,0 +1,85 @@
+-- Count every write to invitations in invitation_counters.changes, which
+-- versions the invitations table for GET /api/invitations ETags.
+-- MAX(updated_at) is a transaction's start time, so a status-only update
+-- committing after a newer write left the version unchanged; changes is
+-- transactional and only ever grows
+-- Safe to re-run
+
+BEGIN;
+
+LOCK TABLE invitations IN SHARE ROW EXCLUSIVE MODE;
+
+ALTER TABLE invitation_counters ADD COLUMN IF NOT EXISTS changes BIGINT NOT NULL DEFAULT 0;
+
+-- The existing triggers call these by name, so replacing them is enough
+CREATE OR REPLACE FUNCTION update_invitation_counters()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        UPDATE invitation_counters SET count = 0, changes = changes + 1;
+        RETURN NULL;
+    END IF;
+
+    -- Counter rows are locked in (status, role) order to avoid deadlocks
+    -- between concurrent statements
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO invitation_counters AS c (status, role, count, changes)
+        SELECT COALESCE(status, 'none'), role, COUNT(*), COUNT(*)
+        FROM new_rows GROUP BY 1, 2 ORDER BY 1, 2
+        ON CONFLICT (status, role) DO UPDATE
+        SET count = c.count + EXCLUDED.count, changes = c.changes + EXCLUDED.changes;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO invitation_counters AS c (status, role, count, changes)
+        SELECT COALESCE(status, 'none'), role, -COUNT(*), COUNT(*)
+        FROM old_rows GROUP BY 1, 2 ORDER BY 1, 2
+        ON CONFLICT (status, role) DO UPDATE
+        SET count = c.count + EXCLUDED.count, changes = c.changes + EXCLUDED.changes;
+    ELSE
+        -- Every updated row counts as a change under its new (status, role),
+        -- so even an update that leaves the counts alone bumps the version
+        INSERT INTO invitation_counters AS c (status, role, count, changes)
+        SELECT status, role, SUM(delta), SUM(changed)
+        FROM (
+            SELECT COALESCE(status, 'none') AS status, role, 1 AS delta, 1 AS changed FROM new_rows
+            UNION ALL
+            SELECT COALESCE(status, 'none'), role, -1, 0 FROM old_rows
+        ) deltas
+        GROUP BY 1, 2 HAVING SUM(delta) <> 0 OR SUM(changed) <> 0 ORDER BY 1, 2
+        ON CONFLICT (status, role) DO UPDATE
+        SET count = c.count + EXCLUDED.count, changes = c.changes + EXCLUDED.changes;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Recompute every counter from invitations; returns the rows that drifted
+-- (expected is the true count, counted what the table held). Blocks writes
+-- to invitations for the duration of the calling transaction.
+CREATE OR REPLACE FUNCTION reconcile_invitation_counters()
+RETURNS TABLE (status VARCHAR, role VARCHAR, expected BIGINT, counted BIGINT) AS $$
+#variable_conflict use_column
+BEGIN
+    LOCK TABLE invitations IN SHARE MODE;
+    LOCK TABLE invitation_counters IN EXCLUSIVE MODE;
+
+    RETURN QUERY
+    WITH actual AS (
+        SELECT COALESCE(i.status, 'none')::VARCHAR AS status, i.role::VARCHAR AS role, COUNT(*) AS count
+        FROM invitations i GROUP BY 1, 2
+    )
+    SELECT COALESCE(a.status, c.status)::VARCHAR, COALESCE(a.role, c.role)::VARCHAR,
+           COALESCE(a.count, 0), COALESCE(c.count, 0)
+    FROM actual a
+    FULL JOIN invitation_counters c ON c.status = a.status AND c.role = a.role
+    WHERE COALESCE(a.count, 0) <> COALESCE(c.count, 0);
+
+    -- Counter rows are kept (at zero when emptied) so changes never goes back
+    UPDATE invitation_counters SET count = 0, changes = changes + 1;
+    INSERT INTO invitation_counters AS c (status, role, count, changes)
+    SELECT COALESCE(i.status, 'none'), i.role, COUNT(*), 1
+    FROM invitations i GROUP BY 1, 2
+    ON CONFLICT (status, role) DO UPDATE SET count = EXCLUDED.count;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMIT;
@@ -10,6 +10,29 @@
 -- Create extensions
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
 CREATE EXTENSION IF NOT EXISTS "pgcrypto";
+CREATE EXTENSION IF NOT EXISTS "pg_trgm";
+
+-- Customer IDs (CUST001, CUST002, ...) are allocated from a sequence so
+-- concurrent inserts never collide
+CREATE SEQUENCE IF NOT EXISTS invitations_customer_number_seq;
+
+CREATE OR REPLACE FUNCTION next_customer_id()
+RETURNS VARCHAR AS $$
+    SELECT 'CUST' || LPAD(n::text, GREATEST(3, LENGTH(n::text)), '0')
+    FROM nextval('invitations_customer_number_seq') AS n;
+$$ LANGUAGE sql;
+
+-- Invitation codes are 'INV' + a hex sequence number + 8 random hex digits.
+-- The sequence part makes every code unique by construction (no retry on
+-- the UNIQUE constraint); the random part keeps codes unguessable
+CREATE SEQUENCE IF NOT EXISTS invitations_code_seq;
+
+CREATE OR REPLACE FUNCTION next_invitation_code()
+RETURNS VARCHAR AS $$
+    SELECT 'INV' || UPPER(LPAD(to_hex(n), GREATEST(6, LENGTH(to_hex(n))), '0'))
+                 || UPPER(encode(gen_random_bytes(4), 'hex'))
+    FROM nextval('invitations_code_seq') AS n;
+$$ LANGUAGE sql;
 
 -- Create invitations table
 CREATE TABLE IF NOT EXISTS invitations (
@@ -19,12 +42,12 @@ CREATE TABLE IF NOT EXISTS invitations (
     email VARCHAR(255) UNIQUE NOT NULL,
     role VARCHAR(50) NOT NULL CHECK (role IN ('entrepreneur', 'investor', 'affiliate')),
     status VARCHAR(20) DEFAULT 'pending' CHECK (status IN ('pending', 'sent', 'accepted', 'expired', 'rejected')),
-    invitation_code VARCHAR(20) UNIQUE NOT NULL,
-    invited_on TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    invitation_code VARCHAR(20) UNIQUE NOT NULL DEFAULT next_invitation_code(),
+    invited_on TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
     accepted_on TIMESTAMP WITH TIME ZONE NULL,
     expires_on TIMESTAMP WITH TIME ZONE DEFAULT (CURRENT_TIMESTAMP + INTERVAL '30 days'),
     user_id UUID NULL,
-    customer_id VARCHAR(20) UNIQUE NULL,
+    customer_id VARCHAR(20) UNIQUE NULL DEFAULT next_customer_id(),
     created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
 );
@@ -137,6 +160,8 @@ CREATE TABLE IF NOT EXISTS email_logs (
     provider VARCHAR(50) DEFAULT 'sendgrid',
     provider_message_id VARCHAR(255) NULL,
     error_message TEXT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMP WITH TIME ZONE NULL,
     sent_at TIMESTAMP WITH TIME ZONE NULL,
     delivered_at TIMESTAMP WITH TIME ZONE NULL,
     opened_at TIMESTAMP WITH TIME ZONE NULL,
@@ -163,6 +188,13 @@ CREATE INDEX IF NOT EXISTS idx_invitations_email ON invitations(email);
 CREATE INDEX IF NOT EXISTS idx_invitations_status ON invitations(status);
 CREATE INDEX IF NOT EXISTS idx_invitations_invited_on ON invitations(invited_on);
 CREATE INDEX IF NOT EXISTS idx_invitations_customer_id ON invitations(customer_id);
+CREATE INDEX IF NOT EXISTS idx_invitations_updated_at ON invitations(updated_at);
+-- GET /api/invitations filters: status/role lists walk these in keyset order;
+-- q (name/email substring) is served by the trigram index
+CREATE INDEX IF NOT EXISTS idx_invitations_status_invited_on ON invitations(status, invited_on, id);
+CREATE INDEX IF NOT EXISTS idx_invitations_role_invited_on ON invitations(role, invited_on, id);
+CREATE INDEX IF NOT EXISTS idx_invitations_search_trgm ON invitations
+    USING gin ((lower(first_name || ' ' || last_name || ' ' || email)) gin_trgm_ops);
 
 CREATE INDEX IF NOT EXISTS idx_users_email ON users(email);
 CREATE INDEX IF NOT EXISTS idx_users_role ON users(role);
@@ -194,6 +226,7 @@ CREATE INDEX IF NOT EXISTS idx_email_logs_recipient_email ON email_logs(recipien
 CREATE INDEX IF NOT EXISTS idx_email_logs_status ON email_logs(status);
 CREATE INDEX IF NOT EXISTS idx_email_logs_email_type ON email_logs(email_type);
 CREATE INDEX IF NOT EXISTS idx_email_logs_created_at ON email_logs(created_at);
+CREATE INDEX IF NOT EXISTS idx_email_logs_outbox ON email_logs(created_at) WHERE status = 'pending';
 
 CREATE INDEX IF NOT EXISTS idx_audit_logs_user_id ON audit_logs(user_id);
 CREATE INDEX IF NOT EXISTS idx_audit_logs_action ON audit_logs(action);
@@ -216,6 +249,136 @@ CREATE TRIGGER update_projects_updated_at BEFORE UPDATE ON projects FOR EACH ROW
 CREATE TRIGGER update_investments_updated_at BEFORE UPDATE ON investments FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 CREATE TRIGGER update_affiliate_referrals_updated_at BEFORE UPDATE ON affiliate_referrals FOR EACH ROW EXECUTE FUNCTION update_updated_at_column();
 
+-- Invitation counts by status x role, kept current by statement-level
+-- triggers so dashboard stats read a few rows instead of scanning
+-- invitations. Each statement applies one aggregated delta per (status,
+-- role), so a bulk insert touches each counter row once.
+-- reconcile_invitation_counters() recomputes them from scratch.
+CREATE TABLE IF NOT EXISTS invitation_counters (
+    status VARCHAR(20) NOT NULL,
+    role VARCHAR(50) NOT NULL,
+    count BIGINT NOT NULL DEFAULT 0,
+    -- Rows written (inserted, updated or deleted) under this counter; only
+    -- ever grows, so its sum versions the invitations table for ETags
+    changes BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (status, role)
+);
+
+CREATE OR REPLACE FUNCTION update_invitation_counters()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'TRUNCATE' THEN
+        UPDATE invitation_counters SET count = 0, changes = changes + 1;
+        RETURN NULL;
+    END IF;
+
+    -- Counter rows are locked in (status, role) order to avoid deadlocks
+    -- between concurrent statements
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO invitation_counters AS c (status, role, count, changes)
+        SELECT COALESCE(status, 'none'), role, COUNT(*), COUNT(*)
+        FROM new_rows GROUP BY 1, 2 ORDER BY 1, 2
+        ON CONFLICT (status, role) DO UPDATE
+        SET count = c.count + EXCLUDED.count, changes = c.changes + EXCLUDED.changes;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO invitation_counters AS c (status, role, count, changes)
+        SELECT COALESCE(status, 'none'), role, -COUNT(*), COUNT(*)
+        FROM old_rows GROUP BY 1, 2 ORDER BY 1, 2
+        ON CONFLICT (status, role) DO UPDATE
+        SET count = c.count + EXCLUDED.count, changes = c.changes + EXCLUDED.changes;
+    ELSE
+        -- Every updated row counts as a change under its new (status, role),
+        -- so even an update that leaves the counts alone bumps the version
+        INSERT INTO invitation_counters AS c (status, role, count, changes)
+        SELECT status, role, SUM(delta), SUM(changed)
+        FROM (
+            SELECT COALESCE(status, 'none') AS status, role, 1 AS delta, 1 AS changed FROM new_rows
+            UNION ALL
+            SELECT COALESCE(status, 'none'), role, -1, 0 FROM old_rows
+        ) deltas
+        GROUP BY 1, 2 HAVING SUM(delta) <> 0 OR SUM(changed) <> 0 ORDER BY 1, 2
+        ON CONFLICT (status, role) DO UPDATE
+        SET count = c.count + EXCLUDED.count, changes = c.changes + EXCLUDED.changes;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS invitation_counters_insert ON invitations;
+DROP TRIGGER IF EXISTS invitation_counters_update ON invitations;
+DROP TRIGGER IF EXISTS invitation_counters_delete ON invitations;
+DROP TRIGGER IF EXISTS invitation_counters_truncate ON invitations;
+
+CREATE TRIGGER invitation_counters_insert AFTER INSERT ON invitations
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_invitation_counters();
+CREATE TRIGGER invitation_counters_update AFTER UPDATE ON invitations
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_invitation_counters();
+CREATE TRIGGER invitation_counters_delete AFTER DELETE ON invitations
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_invitation_counters();
+CREATE TRIGGER invitation_counters_truncate AFTER TRUNCATE ON invitations
+    FOR EACH STATEMENT EXECUTE FUNCTION update_invitation_counters();
+
+-- Recompute every counter from invitations; returns the rows that drifted
+-- (expected is the true count, counted what the table held). Blocks writes
+-- to invitations for the duration of the calling transaction.
+CREATE OR REPLACE FUNCTION reconcile_invitation_counters()
+RETURNS TABLE (status VARCHAR, role VARCHAR, expected BIGINT, counted BIGINT) AS $$
+#variable_conflict use_column
+BEGIN
+    LOCK TABLE invitations IN SHARE MODE;
+    LOCK TABLE invitation_counters IN EXCLUSIVE MODE;
+
+    RETURN QUERY
+    WITH actual AS (
+        SELECT COALESCE(i.status, 'none')::VARCHAR AS status, i.role::VARCHAR AS role, COUNT(*) AS count
+        FROM invitations i GROUP BY 1, 2
+    )
+    SELECT COALESCE(a.status, c.status)::VARCHAR, COALESCE(a.role, c.role)::VARCHAR,
+           COALESCE(a.count, 0), COALESCE(c.count, 0)
+    FROM actual a
+    FULL JOIN invitation_counters c ON c.status = a.status AND c.role = a.role
+    WHERE COALESCE(a.count, 0) <> COALESCE(c.count, 0);
+
+    -- Counter rows are kept (at zero when emptied) so changes never goes back
+    UPDATE invitation_counters SET count = 0, changes = changes + 1;
+    INSERT INTO invitation_counters AS c (status, role, count, changes)
+    SELECT COALESCE(i.status, 'none'), i.role, COUNT(*), 1
+    FROM invitations i GROUP BY 1, 2
+    ON CONFLICT (status, role) DO UPDATE SET count = EXCLUDED.count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Tombstones for delta sync (GET /api/invitations?since=...): deleted
+-- invitations are recorded here so clients can drop them. The trigger also
+-- prunes tombstones past the 30-day retention (INVITATIONS_SYNC_RETENTION)
+CREATE TABLE IF NOT EXISTS invitation_deletions (
+    invitation_id INTEGER NOT NULL,
+    customer_id VARCHAR(20) NULL,
+    deleted_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_invitation_deletions_deleted_at ON invitation_deletions(deleted_at);
+
+CREATE OR REPLACE FUNCTION record_invitation_deletions()
+RETURNS TRIGGER AS $$
+BEGIN
+    INSERT INTO invitation_deletions (invitation_id, customer_id)
+    SELECT id, customer_id FROM old_rows;
+
+    DELETE FROM invitation_deletions WHERE deleted_at < CURRENT_TIMESTAMP - INTERVAL '30 days';
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS invitation_deletions_record ON invitations;
+
+CREATE TRIGGER invitation_deletions_record AFTER DELETE ON invitations
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION record_invitation_deletions();
+
 -- Insert sample data for testing
 INSERT INTO invitations (first_name, last_name, email, role, invitation_code, status, customer_id) VALUES
 ('Alice', 'Cooper', 'alice.cooper@example.com', 'entrepreneur', 'INV1001', 'accepted', 'CUST001'),
@@ -226,15 +389,22 @@ INSERT INTO invitations (first_name, last_name, email, role, invitation_code, st
 ('Ganapati', 'Sridhar', 'ganapati.sridhar2@example.com', 'entrepreneur', 'INV1006', 'pending', 'CUST006')
 ON CONFLICT (email) DO NOTHING;
 
+-- Continue customer numbering after any explicitly inserted IDs
+SELECT setval('invitations_customer_number_seq',
+              COALESCE((SELECT MAX(CAST(SUBSTRING(customer_id FROM 5) AS INTEGER))
+                        FROM invitations WHERE customer_id ~ '^CUST[0-9]+$'), 0) + 1,
+              false);
+
 -- Create views for common queries
+-- Reads the trigger-maintained counters - a handful of rows at any table size
 CREATE OR REPLACE VIEW invitation_stats AS
 SELECT 
-    COUNT(*) as total_invitations,
-    COUNT(CASE WHEN status = 'accepted' THEN 1 END) as accepted_invitations,
-    COUNT(CASE WHEN status IN ('sent', 'pending') THEN 1 END) as pending_invitations,
-    COUNT(CASE WHEN status = 'expired' THEN 1 END) as expired_invitations,
-    COUNT(CASE WHEN status = 'rejected' THEN 1 END) as rejected_invitations
-FROM invitations;
+    COALESCE(SUM(count), 0)::BIGINT as total_invitations,
+    COALESCE(SUM(count) FILTER (WHERE status = 'accepted'), 0)::BIGINT as accepted_invitations,
+    COALESCE(SUM(count) FILTER (WHERE status IN ('sent', 'pending')), 0)::BIGINT as pending_invitations,
+    COALESCE(SUM(count) FILTER (WHERE status = 'expired'), 0)::BIGINT as expired_invitations,
+    COALESCE(SUM(count) FILTER (WHERE status = 'rejected'), 0)::BIGINT as rejected_invitations
+FROM invitation_counters;
 
 CREATE OR REPLACE VIEW user_summary AS
 SELECT 
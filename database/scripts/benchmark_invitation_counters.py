@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark dashboard stats from invitation_counters against a full scan
+
+Grows the invitations table to each target size (1M+ rows by default) and
+times the dashboard query both ways: the old single-pass COUNT(*) FILTER
+aggregate over invitations, and the invitation_stats view over the
+trigger-maintained counters. It also times single-row inserts with the
+counter triggers enabled and disabled to show their write overhead; those
+inserts run in transactions that are rolled back.
+
+Run it against a scratch database with migration 006 applied:
+DATABASE_URL (or DB_HOST/DB_NAME/DB_USER/DB_PASSWORD/DB_PORT). Generated
+rows are removed at the end unless --keep.
+"""
+import time
+import uuid
+import argparse
+import statistics
+
+from db_helpers import connect, grow_table
+
+SCAN_QUERY = """
+    SELECT COUNT(*),
+           COUNT(*) FILTER (WHERE status = 'accepted'),
+           COUNT(*) FILTER (WHERE status IN ('sent', 'pending'))
+    FROM invitations
+"""
+
+COUNTERS_QUERY = """
+    SELECT total_invitations, accepted_invitations, pending_invitations
+    FROM invitation_stats
+"""
+
+COUNTER_TRIGGERS = ('invitation_counters_insert', 'invitation_counters_update',
+                    'invitation_counters_delete', 'invitation_counters_truncate')
+
+def time_query(conn, query, repeats):
+    """Median seconds for a read query"""
+    cursor = conn.cursor()
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        cursor.execute(query)
+        cursor.fetchall()
+        timings.append(time.perf_counter() - start)
+        conn.rollback()
+    cursor.close()
+    return statistics.median(timings)
+
+def time_inserts(conn, count, domain, label, triggers):
+    """Median seconds per single-row insert, rolled back afterwards"""
+    cursor = conn.cursor()
+    if not triggers:
+        for trigger in COUNTER_TRIGGERS:
+            cursor.execute(f"ALTER TABLE invitations DISABLE TRIGGER {trigger}")
+    timings = []
+    try:
+        for i in range(count):
+            start = time.perf_counter()
+            cursor.execute("""
+                INSERT INTO invitations (first_name, last_name, email, role, status)
+                VALUES ('Bench', 'Insert', %s, 'investor', 'sent')
+            """, (f"insert-{label}-{triggers}-{i}@{domain}",))
+            timings.append(time.perf_counter() - start)
+    finally:
+        # Also undoes DISABLE TRIGGER - the counters never see these rows
+        conn.rollback()
+        cursor.close()
+    return statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='100000,1000000,2000000',
+                        help='comma-separated table sizes to measure at')
+    parser.add_argument('--repeats', type=int, default=20, help='timed reads per query and size')
+    parser.add_argument('--inserts', type=int, default=1000, help='timed inserts per mode and size')
+    parser.add_argument('--keep', action='store_true', help='keep generated rows')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    domain = f"counters-bench-{uuid.uuid4().hex[:8]}.example.com"
+
+    conn = connect()
+    cursor = conn.cursor()
+
+    print(f"{'Table rows':>12} {'Scan ms':>9} {'Counters ms':>12} {'Speedup':>8} "
+          f"{'Insert ms':>10} {'+triggers ms':>13}")
+    print("=" * 70)
+    try:
+        for size in sizes:
+            rows = grow_table(cursor, size, domain, statuses=('pending', 'sent', 'accepted', 'expired'))
+            conn.commit()
+            cursor.execute("ANALYZE invitations")
+            conn.commit()
+
+            scan = time_query(conn, SCAN_QUERY, args.repeats)
+            counters = time_query(conn, COUNTERS_QUERY, args.repeats)
+            plain_insert = time_inserts(conn, args.inserts, domain, size, triggers=False)
+            counted_insert = time_inserts(conn, args.inserts, domain, size, triggers=True)
+            print(f"{rows:>12,} {scan * 1000:>9.2f} {counters * 1000:>12.3f} {scan / counters:>7.0f}x "
+                  f"{plain_insert * 1000:>10.3f} {counted_insert * 1000:>13.3f}")
+
+        cursor.execute(SCAN_QUERY)
+        scanned = cursor.fetchone()
+        cursor.execute(COUNTERS_QUERY)
+        counted = cursor.fetchone()
+        conn.rollback()
+        status = "✅ counters agree with the table" if tuple(scanned) == tuple(counted) else \
+            f"❌ counters {tuple(counted)} != table {tuple(scanned)} - run reconcile_invitation_counters.py"
+        print(f"\n{status}")
+    finally:
+        if not args.keep:
+            conn.rollback()
+            cursor.execute("DELETE FROM invitations WHERE email LIKE %s", (f"%@{domain}",))
+            conn.commit()
+        cursor.close()
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Benchmark single-invitation insert throughput as the invitations table grows
+
+Grows the table to each target size with generated rows, then times a run of
+committed single-row inserts that take their customer ID and invitation code
+from the column defaults (the same statement handle_send_invitation runs).
+Throughput should stay flat across sizes - no insert ever retries on the
+invitation_code UNIQUE constraint.
+
+Run it against a scratch database: DATABASE_URL (or DB_HOST/DB_NAME/DB_USER/
+DB_PASSWORD/DB_PORT). Generated rows are removed at the end unless --keep.
+"""
+import time
+import uuid
+import argparse
+import statistics
+
+from db_helpers import connect, grow_table
+
+def time_inserts(conn, count, domain, label):
+    """Time committed single-row inserts; returns per-insert latencies in seconds"""
+    cursor = conn.cursor()
+    latencies = []
+    for i in range(count):
+        start = time.perf_counter()
+        cursor.execute("""
+            INSERT INTO invitations (first_name, last_name, email, role, status)
+            VALUES ('Bench', 'Insert', %s, 'investor', 'sent')
+            RETURNING customer_id, invitation_code
+        """, (f"insert-{label}-{i}@{domain}",))
+        cursor.fetchone()
+        conn.commit()
+        latencies.append(time.perf_counter() - start)
+    cursor.close()
+    return latencies
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', default='10000,100000,1000000,2000000',
+                        help='comma-separated table sizes to measure at')
+    parser.add_argument('--inserts', type=int, default=2000, help='timed inserts per size')
+    parser.add_argument('--keep', action='store_true', help='keep generated rows')
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    domain = f"bench-{uuid.uuid4().hex[:8]}.example.com"
+
+    conn = connect()
+    cursor = conn.cursor()
+
+    print(f"{'Table rows':>12} {'Inserts/s':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    print("=" * 42)
+    try:
+        for size in sizes:
+            rows = grow_table(cursor, size, domain)
+            conn.commit()
+            cursor.execute("ANALYZE invitations")
+            conn.commit()
+
+            latencies = time_inserts(conn, args.inserts, domain, size)
+            latencies.sort()
+            throughput = len(latencies) / sum(latencies)
+            p50 = statistics.median(latencies) * 1000
+            p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+            print(f"{rows:>12,} {throughput:>10,.0f} {p50:>8.2f} {p99:>8.2f}")
+    finally:
+        if not args.keep:
+            conn.rollback()
+            cursor.execute("DELETE FROM invitations WHERE email LIKE %s", (f"%@{domain}",))
+            conn.commit()
+        cursor.close()
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Check that sequence-backed customer IDs never collide under parallel inserts
+
+Runs against the database in DATABASE_URL (or DB_HOST/DB_NAME/DB_USER/
+DB_PASSWORD/DB_PORT) after database/migrations/001_customer_id_sequence.sql
+has been applied. Rows are tagged with a per-run email domain and removed
+at the end.
+"""
+import sys
+import uuid
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from db_helpers import connect
+
+def insert_worker(worker, rows, block_size, domain):
+    """Insert rows one at a time, plus one block-reserved batch, on a private connection"""
+    conn = connect()
+    cursor = conn.cursor()
+    customer_ids = []
+
+    for i in range(rows):
+        cursor.execute("""
+            INSERT INTO invitations (first_name, last_name, email, role, invitation_code, status)
+            VALUES ('Load', 'Test', %s, 'investor', %s, 'sent')
+            RETURNING customer_id
+        """, (f"w{worker}-{i}@{domain}", uuid.uuid4().hex[:20]))
+        customer_ids.append(cursor.fetchone()[0])
+        conn.commit()
+
+    if block_size:
+        cursor.execute("SELECT next_customer_id() FROM generate_series(1, %s)", (block_size,))
+        block = [row[0] for row in cursor.fetchall()]
+        for i, customer_id in enumerate(block):
+            cursor.execute("""
+                INSERT INTO invitations (customer_id, first_name, last_name, email, role, invitation_code, status)
+                VALUES (%s, 'Load', 'Test', %s, 'investor', %s, 'sent')
+            """, (customer_id, f"w{worker}-block{i}@{domain}", uuid.uuid4().hex[:20]))
+        conn.commit()
+        customer_ids.extend(block)
+
+    cursor.close()
+    conn.close()
+    return customer_ids
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=16)
+    parser.add_argument('--rows', type=int, default=50, help='single inserts per worker')
+    parser.add_argument('--block', type=int, default=25, help='block-reserved IDs per worker')
+    args = parser.parse_args()
+
+    domain = f"concurrency-{uuid.uuid4().hex[:8]}.example.com"
+    print(f"🚀 {args.workers} workers x ({args.rows} inserts + {args.block} reserved)")
+
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            futures = [pool.submit(insert_worker, w, args.rows, args.block, domain)
+                       for w in range(args.workers)]
+            allocated = [cid for f in futures for cid in f.result()]
+
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT customer_id, COUNT(*) FROM invitations
+            GROUP BY customer_id HAVING COUNT(*) > 1
+        """)
+        duplicates_in_db = cursor.fetchall()
+        duplicates_allocated = len(allocated) - len(set(allocated))
+
+        print(f"📊 Allocated {len(allocated)} customer IDs")
+        print(f"   Duplicate allocations: {duplicates_allocated}")
+        print(f"   Duplicate customer_id rows in table: {len(duplicates_in_db)}")
+    finally:
+        conn = connect()
+        cursor = conn.cursor()
+        cursor.execute("DELETE FROM invitations WHERE email LIKE %s", (f"%@{domain}",))
+        conn.commit()
+        cursor.close()
+        conn.close()
+
+    if duplicates_allocated or duplicates_in_db:
+        print("❌ Duplicate customer IDs found")
+        sys.exit(1)
+    print("✅ No duplicate customer IDs")
+
+if __name__ == "__main__":
+    main()
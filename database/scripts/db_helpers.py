@@ -0,0 +1,42 @@
+"""
+Database helpers shared by the benchmark and check scripts
+
+Used by the scripts in this directory and in backend/benchmarks.
+"""
+import os
+
+import psycopg2
+
+def connect():
+    """Open a new database connection from the environment"""
+    if os.environ.get('DATABASE_URL'):
+        return psycopg2.connect(os.environ['DATABASE_URL'])
+    return psycopg2.connect(
+        host=os.environ.get('DB_HOST', 'localhost'),
+        database=os.environ.get('DB_NAME', 'peerbridge'),
+        user=os.environ.get('DB_USER'),
+        password=os.environ.get('DB_PASSWORD'),
+        port=os.environ.get('DB_PORT', 5432)
+    )
+
+def grow_table(cursor, target, domain, statuses=('sent',)):
+    """Bulk-load generated rows until the table holds at least target rows; returns the row count
+
+    Generated invitations rotate through the roles and `statuses`, are
+    invited one second apart going back from now, and have emails at
+    `domain` so the caller can delete them afterwards. The caller commits.
+    """
+    cursor.execute("SELECT COUNT(*) FROM invitations")
+    current = cursor.fetchone()[0]
+    if current >= target:
+        return current
+
+    cursor.execute("""
+        INSERT INTO invitations (first_name, last_name, email, role, status, invited_on)
+        SELECT 'Bench', 'Row', 'grow-' || g || '-' || %s || '@' || %s,
+               (ARRAY['entrepreneur', 'investor', 'affiliate'])[1 + g %% 3],
+               (%s::text[])[1 + g %% %s],
+               CURRENT_TIMESTAMP - g * INTERVAL '1 second'
+        FROM generate_series(1, %s) AS g
+    """, (current, domain, list(statuses), len(statuses), target - current))
+    return target
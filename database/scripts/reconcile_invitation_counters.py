@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Recompute the invitation_counters table from scratch and report drift
+
+Runs reconcile_invitation_counters(), which blocks writes to invitations
+while it recounts, and prints every (status, role) whose counter disagreed
+with the table. With --dry-run the recount is rolled back, so the drift is
+reported but the counters are left as they were.
+
+Exits 1 when drift was found (so a scheduled run can alert on it).
+Connects with DATABASE_URL or DB_HOST/DB_NAME/DB_USER/DB_PASSWORD/DB_PORT.
+"""
+import sys
+import argparse
+
+from db_helpers import connect
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--dry-run', action='store_true', help='report drift without fixing it')
+    args = parser.parse_args()
+
+    conn = connect()
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT status, role, expected, counted FROM reconcile_invitation_counters() ORDER BY 1, 2")
+        drift = cursor.fetchall()
+        if args.dry_run:
+            conn.rollback()
+        else:
+            conn.commit()
+    finally:
+        cursor.close()
+        conn.close()
+
+    if not drift:
+        print("✅ invitation_counters match the invitations table")
+        return
+
+    print(f"{'Status':<12} {'Role':<14} {'Actual':>10} {'Counter':>10} {'Drift':>8}")
+    print("=" * 58)
+    for status, role, expected, counted in drift:
+        print(f"{status:<12} {role:<14} {expected:>10,} {counted:>10,} {counted - expected:>+8,}")
+    action = "left unchanged (--dry-run)" if args.dry_run else "recomputed"
+    print(f"\n⚠️  {len(drift)} counter(s) drifted; counters {action}")
+    sys.exit(1)
+
+if __name__ == "__main__":
+    main()